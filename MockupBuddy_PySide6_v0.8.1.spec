@@ -10,7 +10,7 @@ assets = [(os.path.join(assets_path, f), 'assets') for f in os.listdir(assets_pa
 
 a = Analysis(
     ['src/MockupBuddy/MockupBuddy_PySide6_v0.8.1.py'],
-    pathex=['src/MockupBuddy'],
+    pathex=['src/MockupBuddy', 'src'],
     binaries=[],
     datas=assets,
     hiddenimports=collect_submodules('PySide6'),
@@ -0,0 +1,174 @@
+"""
+Regression gate: compares a benchmark run against a baseline.
+
+    python benchmarks/compare.py benchmarks/results/micro-20261019-1200.json
+    python benchmarks/compare.py OLD.json NEW.json [--tolerance 15] [--noise 3]
+    python benchmarks/compare.py --update-baseline benchmarks/results/micro-*.json
+
+Works on the JSON any suite here writes (micro, macro, gui). With one file
+the committed baseline for its suite (benchmarks/baseline/<suite>.json) is
+the reference. Every metric is compared on its `value` in the direction its
+`better` field gives. A change only counts when it is larger than both the
+suite's relative tolerance and the noise of the two runs (NOISE_SIGMAS
+times their combined stdev, for metrics measured more than once). Exits 1
+when any metric regressed, or when a baseline metric is missing from the
+run (a dropped or renamed benchmark) unless --allow-missing is given, so
+it can gate a merge.
+
+The baseline is only ever replaced by --update-baseline, which copies the
+given result files over benchmarks/baseline/<suite>.json; rerun the suites
+on the benchmark machine and commit the new files together with the change
+that moved the numbers. The committed baselines come from
+`micro.py --quick`, `macro.py --corpus smoke --workers 1` and `gui.py`
+with its defaults; gate runs should use the same settings.
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline")
+TOLERANCES = {"micro": 0.10, "macro": 0.10, "gui": 0.20}  # relative; GUI timings include the window system
+DEFAULT_TOLERANCE = 0.10
+NOISE_SIGMAS = 3
+CONFIG_KEYS = ("sizes", "corpus", "library", "frames")  # run settings that change what is measured
+ENVIRONMENT_KEYS = ("machine", "cpus", "python", "pillow", "platform")
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or "suite" not in data or not isinstance(data.get("results"), dict):
+        raise ValueError(f"{path} is not a benchmark results file")
+    return data
+
+
+def baseline_path(suite):
+    return os.path.join(BASELINE_DIR, f"{suite}.json")
+
+
+def _noise(old, new, sigmas):
+    spread = [result["stdev"] for result in (old, new) if result.get("stdev")]
+    return sigmas * math.sqrt(sum(s * s for s in spread)) if len(spread) == 2 else 0.0
+
+
+def compare_metric(old, new, tolerance, sigmas=NOISE_SIGMAS):
+    """Returns (status, relative change) for one metric: 'ok', 'improved' or 'regressed'."""
+    before, after = old["value"], new["value"]
+    change = (after - before) / before if before else 0.0
+    threshold = max(tolerance * abs(before), _noise(old, new, sigmas))
+    if abs(after - before) <= threshold:
+        return "ok", change
+    worse = after > before if old.get("better", "lower") == "lower" else after < before
+    return ("regressed" if worse else "improved"), change
+
+
+def compare(baseline, current, tolerance=None, sigmas=NOISE_SIGMAS):
+    """Yields (name, status, old, new, change) for every metric in either run."""
+    if tolerance is None:
+        tolerance = TOLERANCES.get(current["suite"], DEFAULT_TOLERANCE)
+    old_results, new_results = baseline["results"], current["results"]
+    for name in list(old_results) + [n for n in new_results if n not in old_results]:
+        old, new = old_results.get(name), new_results.get(name)
+        if old is None:
+            yield name, "new", None, new, None
+        elif new is None:
+            yield name, "missing", old, None, None
+        else:
+            status, change = compare_metric(old, new, tolerance, sigmas)
+            yield name, status, old, new, change
+
+
+def mismatches(baseline, current):
+    """Settings and environment that differ between the runs, as readable lines."""
+    lines = []
+    for key in CONFIG_KEYS:
+        if baseline.get(key) != current.get(key):
+            lines.append(f"{key}: {baseline.get(key)} -> {current.get(key)}")
+    old_env, new_env = baseline.get("environment", {}), current.get("environment", {})
+    for key in ENVIRONMENT_KEYS:
+        if old_env.get(key) != new_env.get(key):
+            lines.append(f"{key}: {old_env.get(key)} -> {new_env.get(key)}")
+    return lines
+
+
+def _shown(result):
+    if result is None:
+        return f"{'-':>12}"
+    value = result["value"]
+    return f"{value:>12.3f}" if isinstance(value, float) else f"{value:>12,}"
+
+
+def report(rows, verbose=False, allow_missing=False):
+    counts = {}
+    for name, status, old, new, change in rows:
+        counts[status] = counts.get(status, 0) + 1
+        if status == "ok" and not verbose:
+            continue
+        unit = (old or new)["unit"]
+        delta = f"{change * 100:+7.1f}%" if change is not None else f"{'':>8}"
+        marker = {"regressed": "❌", "improved": "✅", "ok": "  ", "new": "🆕", "missing": "⚠️" if allow_missing else "❌"}[status]
+        print(f"{marker} {name:<52} {_shown(old)} -> {_shown(new)} {unit:<5} {delta}  {status}")
+    return counts
+
+
+def update_baseline(paths):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    for path in paths:
+        suite = load(path)["suite"]
+        shutil.copyfile(path, baseline_path(suite))
+        print(f"💾 Baseline for {suite} updated from {path}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare MockupBuddy benchmark results against a baseline")
+    parser.add_argument("files", nargs="+", metavar="RESULTS",
+                        help="CURRENT (against the committed baseline) or BASELINE CURRENT")
+    parser.add_argument("--tolerance", type=float, metavar="PERCENT",
+                        help="allowed slowdown beyond noise (default: 10, or 20 for the gui suite)")
+    parser.add_argument("--noise", type=float, default=NOISE_SIGMAS, metavar="SIGMAS",
+                        help=f"combined stdevs a change must exceed (default: {NOISE_SIGMAS})")
+    parser.add_argument("--verbose", action="store_true", help="also list metrics that did not change")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="pass even when baseline metrics are absent from the run (e.g. a -k subset)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="copy the given result files over benchmarks/baseline/<suite>.json")
+    args = parser.parse_args(argv)
+
+    if args.update_baseline:
+        return update_baseline(args.files)
+    if len(args.files) > 2:
+        parser.error("give one results file, or a baseline and a results file")
+
+    current = load(args.files[-1])
+    if len(args.files) == 2:
+        baseline_file = args.files[0]
+    else:
+        baseline_file = baseline_path(current["suite"])
+        if not os.path.exists(baseline_file):
+            parser.error(f"no baseline for the {current['suite']} suite; create one with --update-baseline")
+    baseline = load(baseline_file)
+    if baseline["suite"] != current["suite"]:
+        parser.error(f"cannot compare a {baseline['suite']} run with a {current['suite']} run")
+
+    tolerance = args.tolerance / 100 if args.tolerance is not None else None
+    print(f"{current['suite']}: {baseline_file} ({baseline.get('environment', {}).get('commit')}) -> "
+          f"{args.files[-1]} ({current.get('environment', {}).get('commit')})")
+    for line in mismatches(baseline, current):
+        print(f"⚠️ Runs differ in {line}; deltas may not be comparable")
+    counts = report(compare(baseline, current, tolerance, args.noise), args.verbose, args.allow_missing)
+    print(", ".join(f"{counts[status]} {status}" for status in ("regressed", "improved", "ok", "new", "missing")
+                    if counts.get(status)))
+    if counts.get("missing") and not args.allow_missing:
+        print("Baseline metrics are missing from this run; rerun the full suite, refresh the baseline, "
+              "or pass --allow-missing")
+        return 1
+    return 1 if counts.get("regressed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Golden-image check: optimized render paths against the reference render.
+
+    python benchmarks/golden.py [-k pyramid] [--save-diffs FOLDER] [--list]
+
+Renders a fixed matrix of synthetic designs, templates and slider settings
+(MATRIX_*) through reference_render(), the straightforward path the app
+used before any optimization: a direct LANCZOS resize of the full design,
+the alpha scaling and a masked paste. It is a frozen copy of the 0.8.1
+generate_mockups() code and imports nothing from MockupBuddy.render, so
+changes to open_template() or apply_opacity() are checked too rather than
+moving the reference along with them. The same cases then go through every
+entry in PATHS, and each output is compared with its reference pixel by
+pixel: the largest difference in any channel and the PSNR over all
+channels. A path passes when every case stays within its declared
+Tolerance; the script exits 1 otherwise. Inputs are written to a temporary
+folder as real files, so decoding is part of every path.
+
+A new fast path (proxies, lookup-table opacity, bbox trimming, ...) gets
+an entry in PATHS with the tolerance it promises. Lossless paths declare
+Tolerance(0, math.inf).
+"""
+
+import argparse
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+from synthetic import design_image, template_image
+
+from MockupBuddy.batch import plan_batch, run_batch
+from MockupBuddy.pyramid import PyramidCache, build_pyramid
+from MockupBuddy.render import RenderParams, open_template, render_file, render_mockup
+from MockupBuddy.template_store import TemplateStore
+from PIL import Image, ImageChops, ImageStat
+
+# (name, width, height, seed, padding): print-size, square, and smaller than most targets (upscaled)
+MATRIX_DESIGNS = [
+    ("tall", 2250, 2700, 0, 0.10),
+    ("square", 1800, 1800, 1, 0.25),
+    ("small", 300, 360, 2, 0.05),
+]
+# (file, width, height, dark); the JPEG is decoded the same way by every path
+MATRIX_TEMPLATES = [
+    ("light_square.png", 1000, 1000, False),
+    ("dark_wide.jpg", 1200, 900, True),
+    ("light_tall.png", 800, 1000, False),
+]
+MATRIX_PARAMS = [
+    RenderParams(size=400),
+    RenderParams(size=150, opacity=60),
+    RenderParams(size=800, opacity=35, x_offset=120, y_offset=-80),
+    RenderParams(size=1100, x_offset=-300, y_offset=250),  # bigger than the template and partly off it
+    RenderParams(size=400, opacity=0),
+]
+
+
+@dataclass
+class Tolerance:
+    """Largest allowed per-channel difference (0-255) and lowest allowed PSNR in dB."""
+    max_error: int
+    min_psnr: float
+
+
+@dataclass
+class Case:
+    design: str
+    template: str
+    params: RenderParams
+
+    @property
+    def label(self):
+        p = self.params
+        return f"{self.design} on {self.template} @ {p.size}px {p.opacity}% ({p.x_offset:+d},{p.y_offset:+d})"
+
+
+def write_inputs(folder):
+    """Writes the matrix designs and templates as files; returns (design folder, template folder)."""
+    design_dir, template_dir = os.path.join(folder, "designs"), os.path.join(folder, "templates")
+    os.makedirs(design_dir)
+    os.makedirs(template_dir)
+    for name, width, height, seed, padding in MATRIX_DESIGNS:
+        design_image(width, height, seed=seed, padding=padding).save(os.path.join(design_dir, f"{name}.png"))
+    for index, (name, width, height, dark) in enumerate(MATRIX_TEMPLATES):
+        template_image(width, height, dark=dark, seed=index).save(os.path.join(template_dir, name))
+    return design_dir, template_dir
+
+
+def matrix():
+    return [Case(f"{design[0]}.png", template[0], params)
+            for params in MATRIX_PARAMS for design in MATRIX_DESIGNS for template in MATRIX_TEMPLATES]
+
+
+# Frozen from the 0.8.1 desktop script; keep as is even when render.apply_opacity changes
+def _reference_apply_opacity(image, opacity):
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    alpha = image.getchannel('A').point(lambda p: int(p * opacity))
+    image.putalpha(alpha)
+    return image
+
+
+def reference_render(design_path, template_path, params):
+    """The unoptimized render, as generate_mockups() did it in 0.8.1 with params as the sliders."""
+    mockup_img = Image.open(template_path).convert("RGBA")
+    design_img = Image.open(design_path).convert("RGBA")
+    new_w, new_h = params.size, params.size
+
+    overlay = design_img.resize((new_w, new_h), Image.LANCZOS)
+    overlay = _reference_apply_opacity(overlay, params.opacity / 100.0)
+    x = (mockup_img.width - new_w) // 2 + params.x_offset
+    y = (mockup_img.height - new_h) // 2 + params.y_offset
+    mockup_img.paste(overlay, (x, y), overlay)
+    return mockup_img
+
+
+def _each(render):
+    """Adapts render(design_path, template_path, params) -> image to a PATHS entry."""
+    def run(cases, design_dir, template_dir, workdir):
+        for case in cases:
+            yield case, render(os.path.join(design_dir, case.design), os.path.join(template_dir, case.template),
+                               case.params)
+    return run
+
+
+def _full_pyramid(design_path, template_path, params):
+    with Image.open(design_path) as design:
+        levels = build_pyramid(design.convert("RGBA"))
+    return render_mockup(open_template(template_path), levels, params)
+
+
+def _template_store(cases, design_dir, template_dir, workdir):
+    """Templates from the memory-mapped store (the second open of each is served from the map)."""
+    store = TemplateStore(os.path.join(workdir, "store"))
+    pyramids = {}
+    for case in cases:
+        template_path = os.path.join(template_dir, case.template)
+        store.open(template_path).close()
+        cache = pyramids.setdefault(case.params.size, PyramidCache(max_target=case.params.size))
+        yield case, render_mockup(store.open(template_path), cache.get(os.path.join(design_dir, case.design)),
+                                  case.params)
+
+
+def _batch(cases, design_dir, template_dir, workdir):
+    """Full headless batches (pyramid cache, two workers, PNG encode), one per slider setting."""
+    templates = [(name, dark) for name, _, _, dark in MATRIX_TEMPLATES]
+    for params in MATRIX_PARAMS:
+        wanted = {(case.design, case.template): case for case in cases if case.params == params}
+        if not wanted:
+            continue
+        output = os.path.join(workdir, "batch")
+        shutil.rmtree(output, ignore_errors=True)
+        plan = plan_batch(design_dir, template_dir, output, templates, params, move_completed=False)
+        result = run_batch(plan, log=lambda *args: None, force=True, workers=2)
+        if result.failed:
+            raise RuntimeError(f"{result.failed} batch jobs failed at {params}")
+        for job in plan.jobs:
+            case = wanted.get((job.design, job.template))
+            if case is not None:
+                with Image.open(job.out_path) as written:
+                    yield case, written.convert("RGBA")
+
+
+PYRAMID = Tolerance(max_error=24, min_psnr=55.0)  # pyramid.HEADROOM keeps LANCZOS within this of a direct resize
+# name: (run(cases, design_dir, template_dir, workdir) yielding (case, image), tolerance vs reference)
+PATHS = {
+    "pyramid": (_each(_full_pyramid), PYRAMID),
+    "pyramid-trimmed": (_each(render_file), PYRAMID),
+    "template-store": (_template_store, PYRAMID),
+    "batch": (_batch, PYRAMID),
+}
+
+
+def difference(expected, actual):
+    """(max per-channel error, PSNR in dB) between two images of the same size and mode."""
+    if expected.size != actual.size or expected.mode != actual.mode:
+        raise ValueError(f"got {actual.mode} {actual.size}, expected {expected.mode} {expected.size}")
+    diff = ImageChops.difference(expected, actual)
+    max_error = max(high for _, high in diff.getextrema())
+    if max_error == 0:
+        return 0, math.inf
+    mse = sum(ImageStat.Stat(diff).sum2) / (diff.width * diff.height * len(diff.getbands()))
+    return max_error, 10 * math.log10(255 ** 2 / mse)
+
+
+def _save_diff(folder, path_name, case, expected, actual):
+    os.makedirs(folder, exist_ok=True)
+    stem = f"{path_name}-{os.path.splitext(case.design)[0]}-{os.path.splitext(case.template)[0]}-{case.params.size}px-{case.params.opacity}"
+    amplified = ImageChops.difference(expected, actual).convert("RGB").point(lambda p: min(255, p * 8))
+    amplified.save(os.path.join(folder, f"{stem}-diff.png"))
+    actual.save(os.path.join(folder, f"{stem}-actual.png"))
+    expected.save(os.path.join(folder, f"{stem}-expected.png"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare MockupBuddy's optimized render paths with the reference")
+    parser.add_argument("-k", dest="patterns", action="append", default=[], metavar="TEXT",
+                        help="only check paths whose name contains TEXT (repeatable)")
+    parser.add_argument("--save-diffs", metavar="FOLDER", help="write expected/actual/difference images of failures")
+    parser.add_argument("--list", action="store_true", help="list the paths and their tolerances and exit")
+    args = parser.parse_args(argv)
+
+    paths = {name: entry for name, entry in PATHS.items()
+             if not args.patterns or any(pattern in name for pattern in args.patterns)}
+    if args.list:
+        for name, (_, tolerance) in paths.items():
+            print(f"{name:<20} max error {tolerance.max_error}, PSNR >= {tolerance.min_psnr} dB")
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix="mockupbuddy-golden-")
+    try:
+        design_dir, template_dir = write_inputs(workdir)
+        cases = matrix()
+        started = time.monotonic()
+        references = {id(case): reference_render(os.path.join(design_dir, case.design),
+                                                 os.path.join(template_dir, case.template), case.params)
+                      for case in cases}
+        print(f"{len(cases)} reference renders in {time.monotonic() - started:.1f} s")
+
+        failed_paths = []
+        for name, (run, tolerance) in paths.items():
+            started = time.monotonic()
+            worst_error, worst_psnr, failures, checked = 0, math.inf, [], 0
+            for case, image in run(cases, design_dir, template_dir, workdir):
+                checked += 1
+                expected = references[id(case)]
+                try:
+                    max_error, psnr = difference(expected, image)
+                except ValueError as e:
+                    failures.append(f"{case.label}: {e}")
+                    continue
+                worst_error, worst_psnr = max(worst_error, max_error), min(worst_psnr, psnr)
+                if max_error > tolerance.max_error or psnr < tolerance.min_psnr:
+                    failures.append(f"{case.label}: max error {max_error}, PSNR {psnr:.1f} dB")
+                    if args.save_diffs:
+                        _save_diff(args.save_diffs, name, case, expected, image)
+                image.close()
+            if checked != len(cases):
+                failures.append(f"rendered {checked} of {len(cases)} cases")
+            verdict = "❌" if failures else "✅"
+            print(f"{verdict} {name:<20} {checked} cases in {time.monotonic() - started:5.1f} s   "
+                  f"max error {worst_error:>3} (<= {tolerance.max_error})   "
+                  f"min PSNR {worst_psnr:6.1f} dB (>= {tolerance.min_psnr})")
+            for failure in failures:
+                print(f"     {failure}")
+            if failures:
+                failed_paths.append(name)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failed_paths:
+        print(f"Outside tolerance: {', '.join(failed_paths)}")
+        return 1
+    print("All paths within tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
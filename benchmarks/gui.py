@@ -0,0 +1,297 @@
+"""
+Interaction latency of the desktop app, measured offscreen.
+
+    python benchmarks/gui.py [--corpus smoke] [--startup-runs 5] [--frames 60]
+
+Runs MockupBuddy under QT_QPA_PLATFORM=offscreen against a synthetic corpus
+(see synthetic.py) with a throwaway home folder, so the user's own config
+is never read or written, and drives it programmatically:
+
+- startup: importing Qt to the first paint event, split into imports and
+  window construction; each run is a fresh process. Warm runs reuse the
+  bytecode cache, cold runs start from an empty one (the OS file cache is
+  not dropped), and one run under `-X importtime` lists the slowest
+  imports. --library N points the design folder at N files, and the
+  median is checked against STARTUP_BUDGET_MS
+- reload: "Reload Designs & Mockups", first (pyramids not cached) and again
+- design switch: choosing another design until its preview has been
+  painted, for designs not seen yet and for ones already cached
+- slider drag: frame times while sweeping the size and opacity sliders
+- template list: building the template table for 100, 1k and 10k files
+
+Every step ends with a synchronous repaint of what it changed, so the
+numbers include painting. Results go to benchmarks/results/gui-<timestamp>.json.
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# The child processes import nothing from this folder (harness pulls in MockupBuddy, synthetic
+# pulls in PIL), so the app's own imports are timed as they would happen at a real launch.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_SCRIPT = os.path.join(ROOT, "src", "MockupBuddy", "MockupBuddy_PySide6_v0.8.1.py")
+CORPUS_DIR = os.path.join(ROOT, "benchmarks", "corpus")
+TEMPLATE_COUNTS = (100, 1000, 10000)
+STARTUP_BUDGET_MS = 500  # window on screen, from script start, with a 5,000-file library
+IMPORTTIME_TOP = 15
+APP_IMPORTS = "-- app imports start here --"  # written to stderr so -X importtime output can be split
+
+
+def write_listing(folder, count, designs=False):
+    """
+    A folder of `count` tiny PNGs named like templates (or like designs),
+    for timing folder listing and list building rather than decoding.
+    """
+    if os.path.isdir(folder) and len(os.listdir(folder)) == count:
+        return folder
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGBA", (8, 8), (128, 128, 128, 255)).save(buffer, "PNG")
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    for index in range(count):
+        if designs:
+            name = f"design{index:05d}{('-Light', '-Dark', '')[index % 3]}.png"
+        else:
+            name = f"shirt{index:05d}_{'dark' if index % 2 else 'light'}.png"
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(buffer.getvalue())
+    return folder
+
+
+def parse_importtime(stderr, top=IMPORTTIME_TOP):
+    """(total ms, [(module, cumulative ms)] slowest first) of the top-level imports in -X importtime output."""
+    imports = []
+    _, _, stderr = stderr.rpartition(APP_IMPORTS)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  "):  # top level: no extra indentation
+            try:
+                imports.append((name.strip(), int(cumulative) / 1000))
+            except ValueError:
+                pass  # the header line
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return sum(ms for _, ms in imports), imports[:top]
+
+
+# --- child process -----------------------------------------------------------
+
+def _load_app():
+    """Imports Qt and the app script; returns (app, module, start, imports done)."""
+    print(APP_IMPORTS, file=sys.stderr, flush=True)
+    started = time.perf_counter()
+    from PySide6.QtWidgets import QApplication
+
+    spec = importlib.util.spec_from_file_location("MockupBuddy_gui", GUI_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    return QApplication.instance() or QApplication([]), module, started, imported
+
+
+def _open_window(app, module):
+    """Creates and shows the main window; returns (window, construct done, first paint) times."""
+    from PySide6.QtCore import QEvent, QObject, QTimer
+
+    class FirstPaint(QObject):
+        at = None
+
+        def eventFilter(self, obj, event):
+            if self.at is None and event.type() == QEvent.Paint:
+                self.at = time.perf_counter()
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    watcher = FirstPaint()
+    app.installEventFilter(watcher)
+    window = module.MockupBuddy()
+    window.show()
+    constructed = time.perf_counter()
+    app.exec()
+    app.removeEventFilter(watcher)
+    return window, constructed, watcher.at
+
+
+def child_startup():
+    app, module, started, imported = _load_app()
+    _, constructed, painted = _open_window(app, module)
+    return {"imports_ms": (imported - started) * 1000, "window_ms": (constructed - imported) * 1000,
+            "first_paint_ms": (painted - started) * 1000}
+
+
+def _timed(action):
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1000
+
+
+def _sweep(low, high, frames):
+    """`frames` slider values going up from low to high and back down."""
+    half = max(1, frames // 2)
+    up = [low + (high - low) * i // half for i in range(half)]
+    return up + up[::-1][:frames - half]
+
+
+def child_interact(frames, listings):
+    app, module, _, _ = _load_app()
+    window, _, _ = _open_window(app, module)
+    results = {}
+
+    results["reload_cold_ms"] = _timed(lambda: (window.reload_designs_and_mockups(), window.repaint()))
+    results["reload_warm_ms"] = _timed(lambda: (window.reload_designs_and_mockups(), window.repaint()))
+
+    def switch(index):
+        return _timed(lambda: (window.design_dropdown.setCurrentIndex(index), window.preview_label.repaint()))
+
+    designs = range(1, window.design_dropdown.count())
+    results["design_switch_cold_ms"] = [switch(i) for i in designs]
+    results["design_switch_warm_ms"] = [switch(i) for i in designs]
+
+    for name, slider, low, high in (("size", window.size_slider, 200, 800), ("opacity", window.opacity_slider, 20, 100)):
+        results[f"slider_{name}_frame_ms"] = [
+            _timed(lambda value=value: (slider.setValue(value), window.preview_label.repaint()))
+            for value in _sweep(low, high, frames)
+        ]
+
+    for count, folder in listings:
+        window.mockup_folder = folder
+
+        def build():
+            window.populate_template_list()
+            window.template_view.repaint()
+        results[f"template_list_{count}_ms"] = _timed(build)
+    return results
+
+
+# --- parent ------------------------------------------------------------------
+
+def _home(corpus, design_folder=None):
+    """A temporary home folder whose config points at the corpus."""
+    home = tempfile.mkdtemp(prefix="mockupbuddy-bench-")
+    with open(os.path.join(home, ".wbmockup_config.json"), "w") as f:
+        json.dump({"design_folder": design_folder or os.path.join(corpus, "designs"),
+                   "mockup_folder": os.path.join(corpus, "templates"),
+                   "output_folder": os.path.join(home, "out")}, f)
+    shutil.copy(os.path.join(corpus, "templates.json"), os.path.join(home, ".wbmockup_templates.json"))
+    return home
+
+
+def _run_child(home, *args, options=(), python_flags=(), env=None):
+    """Runs this script in child mode; returns (its JSON result, its stderr)."""
+    env = dict(os.environ, HOME=home, USERPROFILE=home, **(env or {}))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    completed = subprocess.run([sys.executable, *python_flags, os.path.abspath(__file__), *options, "--child", *args],
+                               env=env, capture_output=True, text=True)
+    # The result is the last stdout line; the app's own prints come before it
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"GUI run failed (exit {completed.returncode}): {completed.stderr.strip()[-500:]}")
+    return json.loads(lines[-1]), completed.stderr
+
+
+def _cold_child(home):
+    """A startup run with an empty bytecode cache, so every module is compiled again."""
+    cache = tempfile.mkdtemp(prefix="mockupbuddy-pycache-")
+    try:
+        return _run_child(home, "startup", env={"PYTHONPYCACHEPREFIX": cache})[0]
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+
+def child_main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int)
+    parser.add_argument("--child", nargs="+")
+    args = parser.parse_args(argv)
+    mode, *rest = args.child
+    if mode == "startup":
+        result = child_startup()
+    else:
+        listings = [(int(count), folder) for count, folder in zip(rest[::2], rest[1::2])]
+        result = child_interact(args.frames, listings)
+    print(json.dumps(result), flush=True)
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--child" in argv:
+        return child_main(argv)
+    from harness import distribution, metric, print_result, write_results
+    from synthetic import CORPORA, write_corpus
+
+    parser = argparse.ArgumentParser(description="MockupBuddy offscreen GUI latency benchmark")
+    parser.add_argument("--corpus", choices=CORPORA, default="smoke")
+    parser.add_argument("--startup-runs", type=int, default=5, help="fresh processes to time warm startup over")
+    parser.add_argument("--cold-runs", type=int, default=2, help="startups with an empty bytecode cache")
+    parser.add_argument("--library", type=int, default=0, metavar="N",
+                        help="time startup with a design folder of N files (e.g. 5000) instead of the corpus")
+    parser.add_argument("--frames", type=int, default=60, help="slider positions per drag")
+    parser.add_argument("--template-counts", type=int, nargs="+", default=TEMPLATE_COUNTS, metavar="N")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/gui-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    corpus = os.path.join(CORPUS_DIR, args.corpus)
+    write_corpus(corpus, *CORPORA[args.corpus])
+    listing_args = []
+    for count in args.template_counts:
+        listing_args += [str(count), write_listing(os.path.join(CORPUS_DIR, f"listing-{count}"), count)]
+
+    library = None
+    if args.library:
+        library = write_listing(os.path.join(CORPUS_DIR, f"library-{args.library}"), args.library, designs=True)
+    results = {}
+    home = _home(corpus, library)
+    try:
+        runs = [_run_child(home, "startup")[0] for _ in range(args.startup_runs)]
+        for key in ("imports_ms", "window_ms", "first_paint_ms"):
+            results[f"gui/startup/{key[:-3]}"] = distribution([run[key] for run in runs])
+        if args.cold_runs:
+            cold = [_cold_child(home) for _ in range(args.cold_runs)]
+            results["gui/startup/cold_first_paint"] = distribution([run["first_paint_ms"] for run in cold])
+        _, stderr = _run_child(home, "startup", python_flags=("-X", "importtime"))
+        import_total, slowest_imports = parse_importtime(stderr)
+        results["gui/startup/importtime_total"] = metric(import_total, "ms", "lower")
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    home = _home(corpus)
+    try:
+        interaction = _run_child(home, "interact", *listing_args, options=("--frames", str(args.frames)))[0]
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    for key, value in interaction.items():
+        name = f"gui/{key[:-3]}"
+        results[name] = distribution(value) if isinstance(value, list) else metric(value, "ms", "lower")
+
+    for name, result in results.items():
+        print_result(name, result)
+        if "p95" in result and result["runs"] > 2:
+            print(f"  {'':<48} p95 {result['p95']:.3f}  p99 {result['p99']:.3f}  max {result['max']:.3f}")
+    print("Slowest top-level imports (-X importtime, cumulative):")
+    for module, ms in slowest_imports:
+        print(f"  {module:<48} {ms:>12.1f} ms")
+    first_paint = results["gui/startup/first_paint"]["value"]
+    verdict = "within" if first_paint <= STARTUP_BUDGET_MS else "OVER"
+    print(f"Startup to first paint {first_paint:.0f} ms: {verdict} the {STARTUP_BUDGET_MS} ms budget"
+          + (f" ({args.library} designs)" if args.library else ""))
+    path = write_results("gui", results, args.output, corpus=args.corpus, library=args.library,
+                         startup_runs=args.startup_runs, cold_runs=args.cold_runs, frames=args.frames,
+                         startup_budget_ms=STARTUP_BUDGET_MS,
+                         slowest_imports=[{"module": module, "ms": round(ms, 3)} for module, ms in slowest_imports])
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
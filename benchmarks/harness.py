@@ -0,0 +1,140 @@
+"""
+Shared plumbing for the benchmark scripts in this folder.
+
+Importing this module puts ../src on sys.path, the same way the desktop
+script finds the MockupBuddy package, so the scripts run straight from a
+checkout: `python benchmarks/micro.py`.
+
+Every suite writes one JSON file:
+
+    {"suite": "micro", "created": ..., "environment": {...},
+     "results": {"<name>": {"value": ..., "unit": "ms", "better": "lower", ...}}}
+
+`value` is the figure to compare between runs (the median for timings) and
+`better` says which direction is an improvement; timings also carry the
+spread of their samples so comparisons can tell noise from change.
+"""
+
+import gc
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from MockupBuddy import __version__  # noqa: E402
+from MockupBuddy.settings import atomic_write_json  # noqa: E402
+from MockupBuddy.timing import percentile  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+MIN_RUN_TIME = 0.05  # seconds; loops are batched until one sample takes at least this long
+
+
+def measure(func, setup=None, repeat=7, min_time=MIN_RUN_TIME):
+    """
+    Times func() and returns per-call statistics in milliseconds.
+
+    Without setup, calls are batched like timeit.autorange so even
+    microsecond operations get a stable sample. With setup, every sample is
+    a single func(*setup()) call and setup (e.g. copying an image that func
+    modifies in place) is not timed.
+    """
+    number = 1
+    if setup is None:
+        func()  # warm-up, and a first estimate of how many calls fill min_time
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= min_time:
+                break
+            number *= 2
+    else:
+        func(*setup())
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            if setup:
+                func(*args)
+            else:
+                for _ in range(number):
+                    func()
+            samples.append((time.perf_counter() - start) / number * 1000)
+            del args
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {**distribution(samples), "number": number}
+
+
+def distribution(samples, unit="ms"):
+    """Median (as value), spread and tail percentiles of a list of timings."""
+    samples = sorted(samples)
+    return {
+        "value": round(statistics.median(samples), 4),
+        "unit": unit,
+        "better": "lower",
+        "min": round(samples[0], 4),
+        "mean": round(statistics.mean(samples), 4),
+        "p90": round(percentile(samples, 0.90), 4),
+        "p95": round(percentile(samples, 0.95), 4),
+        "p99": round(percentile(samples, 0.99), 4),
+        "max": round(samples[-1], 4),
+        "stdev": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "runs": len(samples),
+    }
+
+
+def metric(value, unit, better):
+    """A single measured figure (throughput, bytes, ...) for the results dict."""
+    return {"value": round(value, 4) if isinstance(value, float) else value, "unit": unit, "better": better}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    from PIL import __version__ as pillow_version
+
+    return {
+        "mockupbuddy": __version__,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pillow": pillow_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(suite, results, output=None, **info):
+    """Writes the suite's JSON file and returns its path."""
+    path = output or os.path.join(RESULTS_DIR, f"{suite}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    atomic_write_json(path, {
+        "suite": suite,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": environment(),
+        **info,
+        "results": results,
+    })
+    return path
+
+
+def print_result(name, result):
+    value = result["value"]
+    shown = f"{value:>12.3f}" if isinstance(value, float) else f"{value:>12,}"
+    spread = f" ± {result['stdev']:.3f}" if "stdev" in result else ""
+    print(f"  {name:<48} {shown}{spread} {result['unit']}", flush=True)
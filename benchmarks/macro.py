@@ -0,0 +1,110 @@
+"""
+End-to-end batch throughput on a synthetic corpus.
+
+    python benchmarks/macro.py [--corpus smoke|small|medium|production]
+                               [--workers 1 --workers 4] [--format png --format jpg]
+
+Writes (or reuses) a corpus from synthetic.write_corpus(), then runs the
+headless batch (`python -m MockupBuddy generate`) once per worker count and
+output format, each in a fresh process and into an empty output folder so
+peak RSS and timings aren't inherited from the previous run. Reports
+images/sec, wall time, mean time per stage from the batch's timing report,
+peak RSS and the bytes of mockups written.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from harness import ROOT, metric, print_result, write_results
+from synthetic import CORPORA, write_corpus
+
+from MockupBuddy.timing import REPORT_DIR, STAGES
+
+CORPUS_DIR = os.path.join(ROOT, "benchmarks", "corpus")
+
+
+def _bytes_written(folder):
+    total = 0
+    for directory, subdirs, files in os.walk(folder):
+        subdirs[:] = [d for d in subdirs if not d.startswith(".")]  # journals, fingerprints, reports
+        total += sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+    return total
+
+
+def run_once(corpus, output, workers, output_format):
+    """Runs one headless batch; returns (end event, timing report)."""
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+    command = [
+        sys.executable, "-m", "MockupBuddy", "generate",
+        "--designs", os.path.join(corpus, "designs"), "--templates", os.path.join(corpus, "templates"),
+        "--templates-json", os.path.join(corpus, "templates.json"), "--output", output,
+        "--workers", str(workers), "--format", output_format, "--timing-report", "--quiet",
+    ]
+    completed = subprocess.run(command, cwd=os.path.join(ROOT, "src"), capture_output=True, text=True)
+    events = [json.loads(line) for line in completed.stdout.splitlines() if line.startswith("{")]
+    end = next((event for event in events if event["event"] == "end"), None)
+    if end is None or end.get("status") != "ok":
+        raise RuntimeError(f"batch failed (exit {completed.returncode}): {completed.stderr.strip()[-500:]}")
+    reports = os.path.join(output, REPORT_DIR)
+    report_files = sorted(f for f in os.listdir(reports) if f.endswith(".timing.json"))
+    with open(os.path.join(reports, report_files[-1])) as f:
+        report = json.load(f)
+    end["bytes_written"] = _bytes_written(output)
+    return end, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MockupBuddy end-to-end batch benchmark")
+    parser.add_argument("--corpus", choices=CORPORA, default="smoke")
+    parser.add_argument("--corpus-dir", help="where the corpus is written (default: benchmarks/corpus/<corpus>)")
+    parser.add_argument("--workers", type=int, action="append", help="worker count to run (repeatable; default: 1 and all CPUs)")
+    parser.add_argument("--format", dest="formats", action="append", choices=("png", "jpg", "webp"),
+                        help="output format to run (repeatable; default: png)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per configuration; the median is reported")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/macro-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    corpus = args.corpus_dir or os.path.join(CORPUS_DIR, args.corpus)
+    print(f"Corpus {args.corpus}: {corpus}")
+    started = time.monotonic()
+    manifest = write_corpus(corpus, *CORPORA[args.corpus])
+    print(f"  ready in {time.monotonic() - started:.1f} s ({manifest['bytes'] / 1024 ** 2:.0f} MB)")
+
+    worker_counts = args.workers or sorted({1, os.cpu_count() or 1})
+    formats = args.formats or ["png"]
+    output = os.path.join(corpus, "out")
+    results = {}
+    for output_format in formats:
+        for workers in worker_counts:
+            runs = [run_once(corpus, output, workers, output_format) for _ in range(args.repeat)]
+            rates = [end["created"] / end["seconds"] for end, _ in runs]
+            end, report = runs[rates.index(statistics.median_low(rates))]
+            prefix = f"batch/{args.corpus}/{output_format}/w{workers}"
+            rate = metric(statistics.median(rates), "img/s", "higher")
+            if len(rates) > 1:
+                rate["stdev"] = round(statistics.stdev(rates), 4)
+            results[f"{prefix}/images_per_sec"] = rate
+            results[f"{prefix}/wall_seconds"] = metric(end["seconds"], "s", "lower")
+            results[f"{prefix}/peak_rss_mb"] = metric(end["peak_rss_mb"], "MB", "lower")
+            results[f"{prefix}/bytes_written"] = metric(end["bytes_written"], "B", "lower")
+            for stage in STAGES:
+                if stage in report["stages"]:
+                    results[f"{prefix}/stage/{stage}_ms"] = metric(report["stages"][stage]["mean"] * 1000, "ms", "lower")
+            print(f"{prefix}: {end['created']} mockups")
+            for name in sorted(n for n in results if n.startswith(prefix + "/")):
+                print_result(name[len(prefix) + 1:], results[name])
+    shutil.rmtree(output, ignore_errors=True)
+    path = write_results("macro", results, args.output, corpus=manifest["params"], repeat=args.repeat)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Micro-benchmarks for each stage of the render path.
+
+    python benchmarks/micro.py [--quick] [-k decode -k encode] [--output FILE]
+
+Covers decoding PNG/JPEG templates at several sizes, LANCZOS resizes of a
+print-size design (direct and through the reduction pyramid),
+apply_opacity, paste vs alpha_composite, PIL -> QImage/QPixmap conversion
+(skipped when PySide6 isn't installed) and encoding to every output
+format. All inputs are synthetic and seeded, so two runs on the same
+machine measure the same work. Results (median ms per call and spread)
+go to benchmarks/results/micro-<timestamp>.json unless --output is given.
+"""
+
+import argparse
+import io
+import os
+import sys
+
+from harness import measure, print_result, write_results
+from synthetic import design_image, template_image
+
+from MockupBuddy.pyramid import build_pyramid, resize_from_pyramid
+from MockupBuddy.render import OUTPUT_FORMATS, RenderParams, apply_opacity, encode_image, open_template, render_mockup
+from PIL import Image
+
+FULL = {"templates": (1000, 2000, 4000), "design": (4500, 5400), "renders": (400, 1200), "mockup": 2000}
+QUICK = {"templates": (1000, 2000), "design": (2250, 2700), "renders": (400, 800), "mockup": 1000}
+
+
+class Inputs:
+    """Builds each synthetic image once, on first use."""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def design(self):
+        return self._get("design", lambda: design_image(*self.sizes["design"]))
+
+    def levels(self):
+        return self._get("levels", lambda: build_pyramid(self.design(), max(self.sizes["renders"])))
+
+    def overlay(self, size):
+        return self._get(("overlay", size), lambda: resize_from_pyramid(self.levels(), (size, size)))
+
+    def template(self, size):
+        return self._get(("template", size), lambda: template_image(size, size))
+
+    def template_bytes(self, size, pil_format):
+        def build():
+            buffer = io.BytesIO()
+            self.template(size).save(buffer, format=pil_format, **({"quality": 90} if pil_format == "JPEG" else {}))
+            return buffer.getvalue()
+        return self._get(("bytes", size, pil_format), build)
+
+    def mockup(self):
+        def build():
+            size = self.sizes["mockup"]
+            return render_mockup(self.template(size).convert("RGBA"), self.levels(), RenderParams(size=size // 4))
+        return self._get("mockup", build)
+
+
+def _qt():
+    """(ImageQt, QPixmap) with an offscreen QGuiApplication, or None without PySide6."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PIL import ImageQt
+        from PySide6.QtGui import QGuiApplication, QPixmap
+    except ImportError:
+        return None
+    if QGuiApplication.instance() is None:
+        _qt.app = QGuiApplication([])
+    return ImageQt.ImageQt, QPixmap
+
+
+def cases(inputs):
+    """Yields (name, factory); factory() returns (func, setup) and builds inputs lazily."""
+    sizes = inputs.sizes
+    design_label = "x".join(map(str, sizes["design"]))
+
+    for size in sizes["templates"]:
+        for pil_format in ("PNG", "JPEG"):
+            def decode(size=size, pil_format=pil_format):
+                data = inputs.template_bytes(size, pil_format)
+                return lambda: open_template(io.BytesIO(data)), None
+            yield f"decode/{pil_format.lower()}/{size}px", decode
+
+    yield f"pyramid/build/{design_label}", lambda: (
+        lambda: build_pyramid(inputs.design(), max(sizes["renders"])), None)
+    for target in sizes["renders"]:
+        yield f"resize/lanczos-direct/{design_label}->{target}px", lambda target=target: (
+            lambda: inputs.design().resize((target, target), Image.LANCZOS), None)
+        yield f"resize/lanczos-pyramid/{design_label}->{target}px", lambda target=target: (
+            lambda: resize_from_pyramid(inputs.levels(), (target, target)), None)
+
+    for target in sizes["renders"]:
+        for opacity in (100, 50):
+            yield f"opacity/{target}px@{opacity}%", lambda target=target, opacity=opacity: (
+                lambda image: apply_opacity(image, opacity / 100.0),
+                lambda: (inputs.overlay(target).copy(),))
+
+    mockup_size = sizes["mockup"]
+    for target in sizes["renders"]:
+        def composite_setup(target=target):
+            template = inputs.template(mockup_size).convert("RGBA")
+            overlay = inputs.overlay(target)
+            offset = ((mockup_size - target) // 2, (mockup_size - target) // 2)
+            return lambda: (template.copy(), overlay, offset)
+        yield f"paste/{mockup_size}px+{target}px", lambda target=target: (
+            lambda template, overlay, offset: template.paste(overlay, offset, overlay), composite_setup(target))
+        yield f"alpha_composite/{mockup_size}px+{target}px", lambda target=target: (
+            lambda template, overlay, offset: template.alpha_composite(overlay, offset), composite_setup(target))
+        yield f"render_mockup/{mockup_size}px+{target}px", lambda target=target: (
+            lambda template: render_mockup(template, inputs.levels(), RenderParams(size=target, opacity=80)),
+            lambda: (inputs.template(mockup_size).convert("RGBA"),))
+
+    def to_qimage():
+        qt = _qt()
+        if qt is None:
+            return None
+        image_qt, _ = qt
+        return lambda: image_qt(inputs.mockup()), None
+
+    def to_qpixmap():
+        qt = _qt()
+        if qt is None:
+            return None
+        image_qt, pixmap = qt
+        return lambda: pixmap.fromImage(image_qt(inputs.mockup())), None
+
+    yield f"qt/imageqt/{mockup_size}px", to_qimage
+    yield f"qt/qpixmap/{mockup_size}px", to_qpixmap
+
+    for extension in OUTPUT_FORMATS:
+        yield f"encode/{extension}/{mockup_size}px", lambda extension=extension: (
+            lambda: encode_image(inputs.mockup(), extension), None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MockupBuddy render-stage micro-benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller images and fewer runs, for a smoke check")
+    parser.add_argument("-k", dest="patterns", action="append", default=[], metavar="TEXT",
+                        help="only run benchmarks whose name contains TEXT (repeatable)")
+    parser.add_argument("--repeat", type=int, help="samples per benchmark (default: 7, or 5 with --quick)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/micro-<timestamp>.json)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK if args.quick else FULL
+    repeat = args.repeat or (5 if args.quick else 7)
+    inputs = Inputs(sizes)
+    results = {}
+    for name, factory in cases(inputs):
+        if args.patterns and not any(pattern in name for pattern in args.patterns):
+            continue
+        if args.list:
+            print(name)
+            continue
+        bench = factory()
+        if bench is None:
+            print(f"  {name:<48} skipped (PySide6 not installed)")
+            continue
+        func, setup = bench
+        results[name] = measure(func, setup, repeat=repeat)
+        print_result(name, results[name])
+    if args.list:
+        return 0
+    path = write_results("micro", results, args.output, sizes=sizes, repeat=repeat)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Deterministic synthetic artwork for benchmarks.
+
+The same seed always draws the same pixels, on any machine, without
+network access or sample files. Designs are RGBA print files with
+transparent padding around hard-edged shapes and a grain texture (so PNG
+compression has real work to do); templates are RGB shirt photos stand-ins,
+dark or light, with a fabric texture.
+
+write_corpus() lays out a whole library of them the way a shop would
+(designs folder, templates folder, saved dark flags); run this file to
+write one: `python benchmarks/synthetic.py /tmp/corpus --corpus small`.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+
+import harness  # noqa: F401  (puts src/ on sys.path)
+from MockupBuddy.settings import atomic_write_json, read_json
+from PIL import Image, ImageChops, ImageDraw
+
+TILE = 256  # noise is generated once per seed at this size and tiled
+
+
+def _noise(rng, size):
+    """An 'L' image of seeded noise covering `size`."""
+    tile = Image.frombytes("L", (TILE, TILE), rng.getrandbits(8 * TILE * TILE).to_bytes(TILE * TILE, "little"))
+    noise = Image.new("L", size)
+    for y in range(0, size[1], TILE):
+        for x in range(0, size[0], TILE):
+            noise.paste(tile, (x, y))
+    return noise
+
+
+def _color(rng, low=0, high=255):
+    return tuple(rng.randint(low, high) for _ in range(3))
+
+
+def design_image(width, height, seed=0, padding=0.1, shapes=24):
+    """An RGBA design with `padding` (fraction of each side) left fully transparent."""
+    rng = random.Random(f"design-{seed}-{width}x{height}")
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    left, top = int(width * padding), int(height * padding)
+    right, bottom = width - left, height - top
+    for _ in range(shapes):
+        x0, x1 = sorted(rng.randint(left, right) for _ in range(2))
+        y0, y1 = sorted(rng.randint(top, bottom) for _ in range(2))
+        fill = _color(rng) + (rng.choice((255, 255, 255, rng.randint(96, 224))),)
+        kind = rng.choice(("ellipse", "rectangle", "polygon"))
+        if kind == "ellipse":
+            draw.ellipse((x0, y0, x1, y1), fill=fill)
+        elif kind == "rectangle":
+            draw.rectangle((x0, y0, x1, y1), fill=fill)
+        else:
+            points = [(rng.randint(left, right), rng.randint(top, bottom)) for _ in range(rng.randint(3, 7))]
+            draw.polygon(points, fill=fill)
+    # Grain only where there is artwork, so the padding stays exactly transparent
+    grain = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    grain.putalpha(ImageChops.multiply(_noise(rng, image.size).point(lambda p: p // 6), image.getchannel("A")))
+    return Image.alpha_composite(image, grain)
+
+
+def template_image(width, height, dark=False, seed=0):
+    """An RGB shirt-on-backdrop template."""
+    rng = random.Random(f"template-{seed}-{width}x{height}-{dark}")
+    backdrop = _color(rng, 200, 245)
+    shirt = _color(rng, 15, 60) if dark else _color(rng, 215, 250)
+    image = Image.new("RGB", (width, height), backdrop)
+    draw = ImageDraw.Draw(image)
+    w, h = width, height
+    draw.polygon([
+        (0.30 * w, 0.10 * h), (0.42 * w, 0.08 * h), (0.50 * w, 0.13 * h), (0.58 * w, 0.08 * h),
+        (0.70 * w, 0.10 * h), (0.92 * w, 0.28 * h), (0.82 * w, 0.40 * h), (0.74 * w, 0.33 * h),
+        (0.74 * w, 0.94 * h), (0.26 * w, 0.94 * h), (0.26 * w, 0.33 * h), (0.18 * w, 0.40 * h),
+        (0.08 * w, 0.28 * h),
+    ], fill=shirt)
+    fabric = Image.new("RGB", image.size, (0, 0, 0))
+    return Image.composite(fabric, image, _noise(rng, image.size).point(lambda p: p // 10))
+
+
+# name: (designs, templates, design size, template size)
+CORPORA = {
+    "smoke": (10, 5, (1500, 1800), (1000, 1000)),
+    "small": (100, 20, (3000, 3600), (2000, 2000)),
+    "medium": (500, 40, (4500, 5400), (2000, 2000)),
+    "production": (2000, 60, (4500, 5400), (2000, 2000)),
+}
+DESIGN_SUFFIXES = ("-Light", "-Dark", "")  # light, dark and neutral designs in turn
+MANIFEST = "corpus.json"
+
+
+def write_corpus(folder, designs, templates, design_size, template_size, seed=0, log=print):
+    """
+    Writes <folder>/designs, <folder>/templates and <folder>/templates.json
+    (dark flags in the format the app saves). Every other template is dark,
+    and half of each are PNG, half JPEG. Designs get between 5% and 25%
+    transparent padding. A manifest records the parameters, and a folder
+    whose manifest already matches is reused as is. Returns the manifest.
+    """
+    params = {"designs": designs, "templates": templates, "design_size": list(design_size),
+              "template_size": list(template_size), "seed": seed}
+    manifest_path = os.path.join(folder, MANIFEST)
+    existing = read_json(manifest_path)
+    if isinstance(existing, dict) and existing.get("params") == params:
+        return existing
+
+    design_dir = os.path.join(folder, "designs")
+    template_dir = os.path.join(folder, "templates")
+    for directory in (design_dir, template_dir):
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+
+    total = 0
+    flags = {}
+    for index in range(templates):
+        dark = index % 2 == 1
+        extension, pil_format = ("png", "PNG") if index % 4 < 2 else ("jpg", "JPEG")
+        name = f"shirt{index + 1:03d}_{'dark' if dark else 'light'}.{extension}"
+        path = os.path.join(template_dir, name)
+        template_image(*template_size, dark=dark, seed=seed + index).save(path, pil_format)
+        flags[name] = {"is_dark": dark}
+        total += os.path.getsize(path)
+    atomic_write_json(os.path.join(folder, "templates.json"), flags)
+
+    rng = random.Random(f"corpus-{seed}")
+    for index in range(designs):
+        name = f"design{index + 1:04d}{DESIGN_SUFFIXES[index % 3]}.png"
+        path = os.path.join(design_dir, name)
+        design_image(*design_size, seed=seed + index, padding=rng.uniform(0.05, 0.25)).save(path)
+        total += os.path.getsize(path)
+        if log and (index + 1) % 50 == 0:
+            log(f"  {index + 1} of {designs} designs written")
+
+    manifest = {"params": params, "bytes": total}
+    atomic_write_json(manifest_path, manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic MockupBuddy corpus")
+    parser.add_argument("folder")
+    parser.add_argument("--corpus", choices=CORPORA, default="smoke")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    manifest = write_corpus(args.folder, *CORPORA[args.corpus], seed=args.seed)
+    print(f"{args.folder}: {manifest['params']['designs']} designs, {manifest['params']['templates']} templates, "
+          f"{manifest['bytes'] / 1024 ** 2:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,9 @@
 from setuptools import setup
 import os
+import sys
+
+# Let py2app find the MockupBuddy package next to the app script
+sys.path.insert(0, 'src')
 
 APP = ['src/MockupBuddy/MockupBuddy_PySide6_v0.8.1.py']
 
@@ -15,6 +19,7 @@ DATA_FILES = [
 OPTIONS = {
     'argv_emulation': True,
     'includes': ['PySide6', 'PIL'],
+    'packages': ['MockupBuddy'],
     'iconfile': 'src/assets/MockupBuddyDesktop.icns',  # For macOS Dock icon
     'plist': {
         'CFBundleName': 'MockupBuddy',
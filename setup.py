@@ -14,7 +14,10 @@ setup(
     ],
     entry_points={
         "gui_scripts": [
-            "mockupbuddy = MockupBuddy.MockupBuddy_PySide6_v0.8:main"
+            "mockupbuddy = MockupBuddy.cli:main"
+        ],
+        "console_scripts": [
+            "mockupbuddy-cli = MockupBuddy.cli:main"
         ]
     },
     python_requires=">=3.8",
@@ -2,14 +2,16 @@
 # ✅ Based on v0.6.5_FULL with restoration of all features and UI updates
 # ✅ Authoritative working baseline for new iterations
 
+import time
+LAUNCHED = time.perf_counter()  # startup is measured from here to the window's first paint
+
 import sys
 import os
-import re
-import json
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QFileDialog, QSlider, QScrollArea, QTextEdit, QSizePolicy,
-    QComboBox, QCheckBox, QProgressBar, QDialog
+    QComboBox, QCheckBox, QProgressBar, QDialog, QTableView, QHeaderView,
+    QAbstractItemView, QLineEdit, QSpinBox
 )
 from PySide6.QtGui import QPixmap, QIcon
 from PySide6.QtCore import Qt
@@ -17,37 +19,20 @@ from PIL import Image, ImageQt
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QScreen
 from PySide6.QtWidgets import QMessageBox
-from collections import defaultdict
-import platform
-import webbrowser
-import subprocess
-
-CONFIG_PATH = os.path.expanduser("~/.wbmockup_config.json")
-TEMPLATES_PATH = os.path.expanduser("~/.wbmockup_templates.json")
-
-def load_config():
-    if os.path.exists(CONFIG_PATH):
-        try:
-            return json.load(open(CONFIG_PATH))
-        except:
-            pass
-    return {}
-
-def save_config(config):
-    with open(CONFIG_PATH, 'w') as f:
-        json.dump(config, f)
+from contextlib import nullcontext
 
-def load_templates():
-    if os.path.exists(TEMPLATES_PATH):
-        try:
-            return json.load(open(TEMPLATES_PATH))
-        except:
-            pass
-    return {}
+# Make the MockupBuddy package importable when this file is run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MockupBuddy.settings import CONFIG_PATH, TEMPLATES_PATH, CACHE_DIR, RENDER_CACHE_GB, SettingsStore
+from MockupBuddy.pyramid import PyramidCache
+from MockupBuddy.render import RenderParams, render_mockup
+from MockupBuddy.diagnostics import MemoryDiagnostics
+from MockupBuddy.models import FileListModel, TemplateTableModel
+from MockupBuddy.profiling import Profiler
+from MockupBuddy.progress import format_duration
+from MockupBuddy.timing import StageTimings, format_stages, span
+from MockupBuddy.naming import get_design_type, is_compatible
 
-def save_templates(templates):
-    with open(TEMPLATES_PATH, 'w') as f:
-        json.dump(templates, f)
 
 def get_asset_path(filename):
     """
@@ -67,78 +52,114 @@ def get_asset_path(filename):
         base_path = os.path.dirname(__file__)
         asset_path = os.path.abspath(os.path.join(base_path, "..", "assets", filename))
 
-    print(f"[Asset Debug] Resolved asset path: {asset_path}")
-    print(f"[Asset Debug] Exists? {os.path.exists(asset_path)}")
+    if not os.path.exists(asset_path):
+        print(f"[Asset Debug] Missing asset: {asset_path}")
     return asset_path
 
-def apply_opacity(image, opacity):
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    alpha = image.getchannel('A').point(lambda p: int(p * opacity))
-    image.putalpha(alpha)
-    return image
-
 def open_support_link():
     url = "https://www.buymeacoffee.com/nicktrautman"
     try:
-        print(f"[Coffee Debug] Attempting to open URL: {url}")
         if sys.platform.startswith('win'):
             os.startfile(url)  # Native Windows method
         else:
+            import webbrowser  # only ever needed here; keeps it off the startup path
             webbrowser.open(url)
     except Exception as e:
         print(f"Error opening support link: {e}")
 
-def normalize_name(filename):
-    name = os.path.splitext(os.path.basename(filename))[0].lower()
-    name = re.sub(r'[\s\-]+', '_', name)  # Replace spaces and dashes with underscores
-    name = re.sub(r'[^a-z0-9_]', '', name)  # Remove special characters
-    return name
-
-def is_light_design(filename):
-    normalized = normalize_name(filename)
-    return normalized.endswith('_light')
-
-def is_dark_design(filename):
-    normalized = normalize_name(filename)
-    return normalized.endswith('_dark')
-
-def get_design_basename(filename):
-    base = normalize_name(filename)
-    base = re.sub(r'_light$|_dark$', '', base)
-    return base
-
 # [File continues with full class implementation previously confirmed]
 
+DEBUG_LOG_MAX_LINES = 2000  # older lines are dropped so long sessions don't grow the log forever
+SCAN_CHUNK = 500  # directory entries read per event-loop turn while restoring folders after startup
+PICKER_WIDTH_CHARS = 28  # pickers get a fixed width instead of measuring every file name
+
 class MockupBuddy(QMainWindow):
-    def __init__(self):
+    def __init__(self, profiler=None, diagnostics=None):
         super().__init__()
+        self.profiler = profiler or Profiler()
+        self.diagnostics = diagnostics or MemoryDiagnostics()
+        self.diagnostics.start()
         self.setWindowTitle("MockupBuddy - PySide6 v0.8")
         self._initialize_window_size()
-        self.config = load_config()
-        self.templates = load_templates()
+        self.config = SettingsStore(CONFIG_PATH)
+        self.templates = SettingsStore(TEMPLATES_PATH)
 
         # Folders from config (or empty)
         self.design_folder = self.config.get("design_folder", "")
         self.mockup_folder = self.config.get("mockup_folder", "")
         self.output_folder = self.config.get("output_folder", "")
         self.move_completed = self.config.get("move_completed", True)
+        self.template_store = None
+        self.batch_worker = None
+        self.set_template_store_enabled(self.config.get("template_store", False))
 
-        self.checkbox_vars = []
+        self.template_model = TemplateTableModel(self)
+        self.template_model.darkFlagChanged.connect(self.update_dark_flag)
 
         self.init_ui()
+        # Designs are resized from cached power-of-two reductions instead of the full print file
+        self.pyramids = PyramidCache(max_target=self.size_slider.maximum())
+
+        # 🔁 Restore folder paths on launch; the folders themselves are scanned after the first paint
+        for label, folder in ((self.design_label, self.design_folder), (self.mockup_label, self.mockup_folder),
+                              (self.output_label, self.output_folder)):
+            if folder:
+                self.set_elided_text(label, folder)
+        self.first_paint_ms = None
+        self._scans = {}  # dropdown -> token of the folder scan that may still fill it
+        self.resume_button.setEnabled(False)
+        # Force preview placeholder on startup (even with preloaded config)
+        self.preview_label.setText("🛑 Preview not available. Please reload Designs & Mockups.")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_ms is None:
+            self.first_paint_ms = (time.perf_counter() - LAUNCHED) * 1000
+            print(f"[Startup] First paint after {self.first_paint_ms:.0f} ms")
+            self.log(f"🖼 Window ready in {self.first_paint_ms:.0f} ms")
+            QTimer.singleShot(0, self.restore_folders)
 
-        # 🔁 Restore folder paths and dropdowns on launch
+    def restore_folders(self):
+        """Fills the pickers from the saved folders without rendering a preview (that waits for a reload)."""
         if self.design_folder:
-            self.set_elided_text(self.design_label, self.design_folder)
-            self.populate_dropdown(self.design_dropdown, self.design_folder)
+            self.scan_folder_incrementally(self.design_dropdown, self.design_folder)
         if self.mockup_folder:
-            self.set_elided_text(self.mockup_label, self.mockup_folder)
-            self.populate_dropdown(self.mockup_dropdown, self.mockup_folder)
-        if self.output_folder:
-            self.set_elided_text(self.output_label, self.output_folder)
-        # Force preview placeholder on startup (even with preloaded config)
-        QTimer.singleShot(0, lambda: self.preview_label.setText("🛑 Preview not available. Please reload Designs & Mockups."))
+            self.scan_folder_incrementally(self.mockup_dropdown, self.mockup_folder)
+        QTimer.singleShot(0, self.update_resume_button)
+
+    def scan_folder_incrementally(self, dropdown, folder):
+        """
+        Lists the image files in folder a chunk per event-loop turn, so a huge
+        or slow folder never freezes the window, then fills the dropdown. A
+        populate_dropdown() for the same dropdown in the meantime wins.
+        """
+        token = self._scans[dropdown] = object()
+        try:
+            entries = os.scandir(folder)
+        except OSError:
+            return
+        names = []
+
+        def step():
+            if self._scans.get(dropdown) is not token:
+                entries.close()
+                return
+            for _ in range(SCAN_CHUNK):
+                entry = next(entries, None)
+                if entry is None:
+                    entries.close()
+                    del self._scans[dropdown]
+                    dropdown.blockSignals(True)
+                    dropdown.model().set_names(names)
+                    if dropdown.currentIndex() < 0 and dropdown.model().rowCount():
+                        dropdown.setCurrentIndex(0)
+                    dropdown.blockSignals(False)
+                    return
+                if entry.name.lower().endswith(('png', 'jpg', 'jpeg')):
+                    names.append(entry.name)
+            QTimer.singleShot(0, step)
+
+        step()
     
     def get_design_type(self, filename):
         name = filename.lower()
@@ -149,10 +170,6 @@ class MockupBuddy(QMainWindow):
         else:
             return "neutral"
 
-    def calculate_new_size(self, image):
-        size = self.size_slider.value()
-        return size, size
-
     def _initialize_window_size(self):
         screen = QScreen.availableGeometry(QApplication.primaryScreen())
         screen_width = screen.width()
@@ -168,8 +185,7 @@ class MockupBuddy(QMainWindow):
     def init_ui(self):
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
-        import platform
-        icon_filename = "MockupBuddyDesktop.icns" if platform.system() == "Darwin" else "MockupBuddyDesktop.ico"
+        icon_filename = "MockupBuddyDesktop.icns" if sys.platform == "darwin" else "MockupBuddyDesktop.ico"
         icon_path = get_asset_path(icon_filename)
         self.setWindowIcon(QIcon(icon_path))
         layout = QHBoxLayout(main_widget)
@@ -209,14 +225,24 @@ class MockupBuddy(QMainWindow):
         control_layout.addWidget(self.output_label)
 
         # Design & Mockup dropdowns
+        # Both pickers are backed by searchable list models, never by per-item widgets
+        self.design_model = FileListModel(self)
+        self.mockup_model = FileListModel(self)
         self.design_dropdown = QComboBox()
-        self.mockup_dropdown = QComboBox()
+        self.design_dropdown.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.design_dropdown.setMinimumContentsLength(PICKER_WIDTH_CHARS)
+        self.design_dropdown.setModel(self.design_model)
         self.design_dropdown.blockSignals(True)
         self.design_dropdown.currentIndexChanged.connect(self.on_design_changed)
         self.design_dropdown.blockSignals(False)
-        self.mockup_dropdown.currentIndexChanged.connect(self.update_preview)
+
+        self.design_search = QLineEdit()
+        self.design_search.setPlaceholderText("🔎 Type to find a design...")
+        self.design_search.setClearButtonEnabled(True)
+        self.design_search.textChanged.connect(self.filter_designs)
 
         control_layout.addWidget(QLabel("🎨 Select Design"))
+        control_layout.addWidget(self.design_search)
         control_layout.addWidget(self.design_dropdown)
         
 
@@ -224,34 +250,58 @@ class MockupBuddy(QMainWindow):
         self.template_header = QLabel("🧩 Mockup Templates")
         control_layout.addWidget(self.template_header)
 
-        self.template_scroll = QScrollArea()
-        self.template_scroll.setWidgetResizable(True)
-        self.template_widget = QWidget()
-        self.template_layout = QVBoxLayout()
-        self.template_widget.setLayout(self.template_layout)
-        self.template_scroll.setWidget(self.template_widget)
-        self.template_scroll.setFixedHeight(150)
-        control_layout.addWidget(self.template_scroll)
+        self.template_filter = QLineEdit()
+        self.template_filter.setPlaceholderText("Filter templates...")
+        self.template_filter.setClearButtonEnabled(True)
+        self.template_filter.textChanged.connect(self.template_model.set_filter)
+
+        select_all_button = QPushButton("Select All")
+        select_none_button = QPushButton("Select None")
+        select_all_button.setToolTip("Tick every template matching the filter")
+        select_none_button.setToolTip("Untick every template matching the filter")
+        select_all_button.clicked.connect(lambda: self.template_model.set_visible_selected(True))
+        select_none_button.clicked.connect(lambda: self.template_model.set_visible_selected(False))
+
+        template_tools = QHBoxLayout()
+        template_tools.addWidget(self.template_filter)
+        template_tools.addWidget(select_all_button)
+        template_tools.addWidget(select_none_button)
+        control_layout.addLayout(template_tools)
+
+        # Model/view list: only rows on screen are ever painted, so thousands of templates stay cheap
+        self.template_view = QTableView()
+        self.template_view.setModel(self.template_model)
+        self.template_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.template_view.setShowGrid(False)
+        self.template_view.setWordWrap(False)
+        self.template_view.verticalHeader().setVisible(False)
+        self.template_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.template_view.verticalHeader().setDefaultSectionSize(22)
+        self.template_view.horizontalHeader().setSectionResizeMode(TemplateTableModel.USE_COLUMN, QHeaderView.Stretch)
+        self.template_view.horizontalHeader().setSectionResizeMode(TemplateTableModel.DARK_COLUMN, QHeaderView.Fixed)
+        self.template_view.horizontalHeader().resizeSection(TemplateTableModel.DARK_COLUMN, 90)
+        self.template_view.setFixedHeight(150)
+        control_layout.addWidget(self.template_view)
 
         # Sliders and lock aspect toggle
         self.size_slider = QSlider(Qt.Horizontal)
         self.size_slider.setRange(50, 1000)
-        self.size_slider.setValue(400)
+        self.size_slider.setValue(self.config.get("size", 400))
         self.size_slider.valueChanged.connect(self.update_preview)
 
         self.opacity_slider = QSlider(Qt.Horizontal)
         self.opacity_slider.setRange(0, 100)
-        self.opacity_slider.setValue(100)
+        self.opacity_slider.setValue(self.config.get("opacity", 100))
         self.opacity_slider.valueChanged.connect(self.update_preview)
 
         self.x_offset_slider = QSlider(Qt.Horizontal)
         self.x_offset_slider.setRange(-500, 500)
-        self.x_offset_slider.setValue(0)
+        self.x_offset_slider.setValue(self.config.get("x_offset", 0))
         self.x_offset_slider.valueChanged.connect(self.update_preview)
 
         self.y_offset_slider = QSlider(Qt.Horizontal)
         self.y_offset_slider.setRange(-500, 500)
-        self.y_offset_slider.setValue(0)
+        self.y_offset_slider.setValue(self.config.get("y_offset", 0))
         self.y_offset_slider.valueChanged.connect(self.update_preview)
 
 
@@ -259,8 +309,6 @@ class MockupBuddy(QMainWindow):
         slider_layout = QVBoxLayout()
         slider_container.setLayout(slider_layout)
         
-        from PySide6.QtWidgets import QLineEdit
-
         for label_text, slider in [
             ("Design Size", self.size_slider),
             ("Opacity", self.opacity_slider),
@@ -287,6 +335,15 @@ class MockupBuddy(QMainWindow):
 
 
 
+        # 💾 Remember slider positions between sessions
+        for key, slider in [
+            ("size", self.size_slider),
+            ("opacity", self.opacity_slider),
+            ("x_offset", self.x_offset_slider),
+            ("y_offset", self.y_offset_slider)
+        ]:
+            slider.valueChanged.connect(lambda val, k=key: self.config.set(k, val))
+
         # Now add the whole block to the sidebar
         control_layout.addWidget(slider_container)
 
@@ -297,11 +354,57 @@ class MockupBuddy(QMainWindow):
         self.generate_button.clicked.connect(self.generate_mockups)
         control_layout.addWidget(self.generate_button)
 
+        self.resume_button = QPushButton("⏯ Resume Interrupted Batch")
+        self.resume_button.setToolTip("Finish the last batch in the output folder, skipping mockups already written")
+        self.resume_button.clicked.connect(self.resume_last_batch)
+        control_layout.addWidget(self.resume_button)
+
         self.move_checkbox = QCheckBox("📁 Move used designs to 'Completed Designs'")
         self.move_checkbox.setChecked(self.move_completed)
         self.move_checkbox.stateChanged.connect(lambda: self.set_move_flag(self.move_checkbox.isChecked()))
         control_layout.addWidget(self.move_checkbox)
 
+        self.store_checkbox = QCheckBox("⚡ Keep decoded templates on disk (faster repeat batches)")
+        self.store_checkbox.setToolTip(f"Stores raw template pixels in {CACHE_DIR} so they load without PNG decoding")
+        self.store_checkbox.setChecked(self.template_store is not None)
+        self.store_checkbox.stateChanged.connect(lambda: self.set_template_store_enabled(self.store_checkbox.isChecked()))
+        control_layout.addWidget(self.store_checkbox)
+
+        self.render_cache_checkbox = QCheckBox("🗄 Reuse identical renders from the render cache")
+        self.render_cache_checkbox.setToolTip(
+            f"Keeps encoded mockups in {CACHE_DIR} and copies them into new output folders instead of re-rendering"
+        )
+        self.render_cache_checkbox.setChecked(self.config.get("render_cache", False))
+        self.render_cache_gb = QSpinBox()
+        self.render_cache_gb.setRange(1, 1000)
+        self.render_cache_gb.setSuffix(" GB")
+        self.render_cache_gb.setToolTip("Disk budget of the render cache; the least recently used renders go first")
+        self.render_cache_gb.setValue(int(self.config.get("render_cache_gb", RENDER_CACHE_GB)))
+        self.render_cache_gb.setEnabled(self.render_cache_checkbox.isChecked())
+        self.render_cache_gb.valueChanged.connect(lambda value: self.config.set("render_cache_gb", value))
+        self.render_cache_checkbox.stateChanged.connect(self.on_render_cache_toggled)
+        render_cache_row = QHBoxLayout()
+        render_cache_row.addWidget(self.render_cache_checkbox)
+        render_cache_row.addWidget(self.render_cache_gb)
+        render_cache_row.addStretch()
+        control_layout.addLayout(render_cache_row)
+
+        self.dedupe_checkbox = QCheckBox("🧬 Render duplicate designs/templates only once")
+        self.dedupe_checkbox.setToolTip("Byte-identical designs or templates (e.g. 'copy (2)') are rendered once and copied")
+        self.dedupe_checkbox.setChecked(self.config.get("dedupe", False))
+        self.dedupe_checkbox.stateChanged.connect(lambda: self.config.set("dedupe", self.dedupe_checkbox.isChecked()))
+        control_layout.addWidget(self.dedupe_checkbox)
+
+        self.timing_checkbox = QCheckBox("⏱ Time render stages (batch report + trace, preview log)")
+        self.timing_checkbox.setToolTip(
+            "Writes a per-stage JSON/CSV timing report and a Chrome/Perfetto trace to <output>/.mockupbuddy/reports"
+        )
+        self.timing_checkbox.setChecked(self.config.get("timing_report", False))
+        self.timing_checkbox.stateChanged.connect(
+            lambda: self.config.set("timing_report", self.timing_checkbox.isChecked())
+        )
+        control_layout.addWidget(self.timing_checkbox)
+
 
         control_layout.addStretch()
 
@@ -317,6 +420,9 @@ class MockupBuddy(QMainWindow):
 
         # Mockup dropdown now above preview label
         self.mockup_dropdown = QComboBox()
+        self.mockup_dropdown.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.mockup_dropdown.setMinimumContentsLength(PICKER_WIDTH_CHARS)
+        self.mockup_dropdown.setModel(self.mockup_model)
         self.mockup_dropdown.currentIndexChanged.connect(self.update_preview)
         self.mockup_dropdown.setVisible(False)  # Hidden until design is selected
  
@@ -329,10 +435,7 @@ class MockupBuddy(QMainWindow):
         dropdown_layout.addWidget(QLabel("🖼 Select Mockup Preview"))
         dropdown_layout.addWidget(self.mockup_dropdown)
         dropdown_layout.addStretch()
-        print("[Coffee Debug] Attempting to resolve path to Buy Me a Coffee asset...")
         coffee_path = get_asset_path("bmcNT.png")
-        print("[Coffee Debug] Resolved path:", coffee_path)
-        print("[Coffee Debug] Exists?", os.path.exists(coffee_path))
         if not os.path.exists(coffee_path):
             from PySide6.QtWidgets import QMessageBox
             QMessageBox.warning(None, "Asset Error", f"bmcNT.png not found at:\n{coffee_path}")
@@ -352,13 +455,22 @@ class MockupBuddy(QMainWindow):
 
         self.debug_log = QTextEdit()
         self.debug_log.setReadOnly(True)
+        self.debug_log.document().setMaximumBlockCount(DEBUG_LOG_MAX_LINES)
         self.debug_log.setMaximumHeight(120)
         self.debug_log.setVisible(False)
 
         self.debug_toggle = QCheckBox("Show Debug Log")
         self.debug_toggle.stateChanged.connect(lambda: self.debug_log.setVisible(self.debug_toggle.isChecked()))
 
-        right_layout.addWidget(self.debug_toggle)
+        self.profile_button = QPushButton("🔬 Profile next preview/batch")
+        self.profile_button.setToolTip("Saves a cProfile .prof file for the next preview and the next batch")
+        self.profile_button.clicked.connect(self.arm_profiler)
+
+        debug_row = QHBoxLayout()
+        debug_row.addWidget(self.debug_toggle)
+        debug_row.addWidget(self.profile_button)
+        debug_row.addStretch()
+        right_layout.addLayout(debug_row)
         right_layout.addWidget(self.debug_log)
 
         # Wrap up layout
@@ -370,15 +482,49 @@ class MockupBuddy(QMainWindow):
         self.preview_label.clear()
         self.preview_label.setText("🛑 Preview not available. Please reload Designs & Mockups.")
         self.design_dropdown.setCurrentIndex(-1)
-        self.mockup_dropdown.clear()
+        self.mockup_model.clear()
         self.mockup_dropdown.setVisible(False)
         control_layout.setContentsMargins(10, 10, 10, 20)  # Add some bottom padding
         QTimer.singleShot(100, lambda: control_scroll.ensureVisible(0, 0))
 
+    def closeEvent(self, event):
+        if self.batch_worker is not None:
+            # Stop between jobs; the journal stays open so the batch can be resumed next time
+            self.batch_worker.cancel()
+            self.batch_worker.wait()
+        self.config.flush()
+        self.templates.flush()
+        super().closeEvent(event)
+
     def set_move_flag(self, value):
         self.move_completed = value
-        self.config["move_completed"] = value
-        save_config(self.config)
+        self.config.set("move_completed", value)
+
+    def on_render_cache_toggled(self):
+        enabled = self.render_cache_checkbox.isChecked()
+        self.config.set("render_cache", enabled)
+        self.render_cache_gb.setEnabled(enabled)
+
+    def set_template_store_enabled(self, enabled):
+        self.config.set("template_store", enabled)
+        if not enabled:
+            self.template_store = None
+            return
+        from MockupBuddy.template_store import TemplateStore
+        try:
+            self.template_store = TemplateStore(os.path.join(CACHE_DIR, "templates"))
+        except OSError as e:
+            print(f"[Template Store] Disabled: {e}")
+            self.template_store = None
+
+    def open_template(self, path, log=None):
+        if self.template_store is not None:
+            try:
+                return self.template_store.open(path)
+            except OSError as e:
+                (log or self.log)(f"⚠️ Template store miss for {os.path.basename(path)}: {e}")
+        with Image.open(path) as img:
+            return img.convert("RGBA")
 
     def log(self, message):
         self.debug_log.append(message)
@@ -387,8 +533,7 @@ class MockupBuddy(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Design Folder", self.design_folder)
         if folder:
             self.design_folder = folder
-            self.config["design_folder"] = folder
-            save_config(self.config)
+            self.config.set("design_folder", folder)
             self.set_elided_text(self.design_label, folder)
             self.populate_dropdown(self.design_dropdown, folder)
 
@@ -396,39 +541,54 @@ class MockupBuddy(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Mockup Folder", self.mockup_folder)
         if folder:
             self.mockup_folder = folder
-            self.config["mockup_folder"] = folder
-            save_config(self.config)
+            self.config.set("mockup_folder", folder)
             self.set_elided_text(self.mockup_label, folder)
             self.populate_dropdown(self.mockup_dropdown, folder)
 
-            self.populate_template_checkboxes()
+            self.populate_template_list()
 
     def select_output_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Output Folder", self.output_folder)
         if folder:
             self.output_folder = folder
-            self.config["output_folder"] = folder
-            save_config(self.config)
+            self.config.set("output_folder", folder)
             self.set_elided_text(self.output_label, folder)
+            self.update_resume_button()
 
     def populate_dropdown(self, dropdown, folder):
-        dropdown.clear()
+        self._scans.pop(dropdown, None)
+        model = dropdown.model()
         if not os.path.isdir(folder):
+            model.clear()
             return
-        files = sorted([f for f in os.listdir(folder) if f.lower().endswith(('png', 'jpg', 'jpeg'))])
-        dropdown.addItems(files)
-        
+        model.set_names(f for f in os.listdir(folder) if f.lower().endswith(('png', 'jpg', 'jpeg')))
+        if dropdown.currentIndex() < 0 and model.rowCount():
+            dropdown.setCurrentIndex(0)
+
+    def filter_designs(self, text):
+        current = self.design_dropdown.currentText()
+        self.design_dropdown.blockSignals(True)
+        self.design_model.set_filter(text)
+        row = self.design_model.row_of(current) if current else -1
+        if row < 0 and self.design_model.rowCount():
+            row = 0
+        self.design_dropdown.setCurrentIndex(row)
+        self.design_dropdown.blockSignals(False)
+        if self.design_dropdown.currentText() != current:
+            self.on_design_changed()
+
     def populate_mockup_dropdown(self):
-        self.mockup_dropdown.clear()
+        self._scans.pop(self.mockup_dropdown, None)
         design_name = self.design_dropdown.currentText()
         if not design_name:
+            self.mockup_model.clear()
             return
 
         design_type = self.get_design_type(design_name)
 
         valid_files = []
-        for file, checkbox, dark_toggle in self.checkbox_vars:
-            is_dark = dark_toggle.isChecked()
+        for file in self.template_model.files:
+            is_dark = self.template_model.is_dark(file)
             if (
                 design_type == "neutral" or
                 (design_type == "dark" and is_dark) or
@@ -436,7 +596,9 @@ class MockupBuddy(QMainWindow):
             ):
                 valid_files.append(file)
 
-        self.mockup_dropdown.addItems(valid_files)
+        self.mockup_model.set_names(valid_files)
+        if self.mockup_dropdown.currentIndex() < 0 and valid_files:
+            self.mockup_dropdown.setCurrentIndex(0)
         self.mockup_dropdown.setVisible(bool(valid_files))
         
     def on_design_changed(self):
@@ -446,7 +608,31 @@ class MockupBuddy(QMainWindow):
         self.update_preview()
 
 
+    def arm_profiler(self):
+        self.profiler.arm()
+        self.log(f"🔬 The next preview and batch will be profiled into {self.profiler.directory}")
+
+    def memory_snapshot(self, label=None):
+        """Takes a diagnostics snapshot (every Nth preview when label is None) with cache sizes attached."""
+        if not self.diagnostics.enabled:
+            return
+        extra = {
+            "pyramid_cache_mb": round(self.pyramids.nbytes / 1024 ** 2, 1),
+            "pyramid_budget_mb": round(self.pyramids.max_bytes / 1024 ** 2, 1),
+            "debug_log_lines": self.debug_log.document().blockCount(),
+        }
+        entry = self.diagnostics.preview_done(**extra) if label is None else self.diagnostics.snapshot(label, **extra)
+        if entry:
+            self.log(f"🧠 {self.diagnostics.describe(entry)} — report: {self.diagnostics.path}")
+
     def update_preview(self):
+        with self.profiler.profile("preview") as run:
+            self._render_preview()
+        if run and run.path:
+            self.log(f"🔬 Preview profile ({run.seconds * 1000:.0f} ms) saved to {run.path}")
+        self.memory_snapshot()
+
+    def _render_preview(self):
         if not (self.mockup_folder and self.design_folder):
             return
 
@@ -456,19 +642,11 @@ class MockupBuddy(QMainWindow):
         if not (design_name and mockup_name):
             return
 
-        design_type = "neutral"
-        if is_dark_design(design_name):
-            design_type = "dark"
-        elif is_light_design(design_name):
-            design_type = "light"
-
+        design_type = get_design_type(design_name)
         is_dark_mockup = self.templates.get(mockup_name, {}).get("is_dark", False)
 
         # 🛑 Prevent mismatched preview attempts before rendering begins
-        if (
-            (design_type == "dark" and not is_dark_mockup) or
-            (design_type == "light" and is_dark_mockup)
-        ):
+        if not is_compatible(design_type, is_dark_mockup):
             self.preview_label.setText("⚠️ Incompatible Design and Mockup pairing.")
             self.log(f"⚠️ Skipped preview for {design_name} on {mockup_name} due to pairing rules.")
             return
@@ -477,24 +655,25 @@ class MockupBuddy(QMainWindow):
         design_path = os.path.join(self.design_folder, design_name)
         mockup_path = os.path.join(self.mockup_folder, mockup_name)
 
+        timings = StageTimings() if self.config.get("timing_report", False) else None
         try:
-            mockup_img = Image.open(mockup_path).convert("RGBA")
-            design_img = Image.open(design_path).convert("RGBA")
-            new_w, new_h = self.calculate_new_size(design_img)
-
-            design_img = design_img.resize((new_w, new_h), Image.LANCZOS)
-            design_img = apply_opacity(design_img, self.opacity_slider.value() / 100.0)
-            x = (mockup_img.width - new_w) // 2 + self.x_offset_slider.value()
-            y = (mockup_img.height - new_h) // 2 + self.y_offset_slider.value()
-
-            mockup_img.paste(design_img, (x, y), design_img)
-            qt_img = QPixmap.fromImage(ImageQt.ImageQt(mockup_img))
-            self.preview_label.setPixmap(qt_img.scaled(
-                self.preview_label.width(), self.preview_label.height(),
-                Qt.KeepAspectRatio, Qt.SmoothTransformation
-            ))
-
-            self.log(f"Preview: {design_name} + {mockup_name}")
+            with timings.job("preview") if timings else nullcontext({}) as stages:
+                with span("decode"):
+                    mockup_img = self.open_template(mockup_path)
+                    design_levels = self.pyramids.get(design_path)
+                mockup_img = render_mockup(mockup_img, design_levels, self.current_render_params())
+                with span("display"):
+                    qt_img = QPixmap.fromImage(ImageQt.ImageQt(mockup_img))
+                    mockup_img.close()
+                    self.preview_label.setPixmap(qt_img.scaled(
+                        self.preview_label.width(), self.preview_label.height(),
+                        Qt.KeepAspectRatio, Qt.SmoothTransformation
+                    ))
+
+            if timings:
+                self.log(f"Preview: {design_name} + {mockup_name} ({format_stages(stages)}, display {stages['display'] * 1000:.0f} ms)")
+            else:
+                self.log(f"Preview: {design_name} + {mockup_name}")
         except Exception as e:
             self.log(f"Preview error: {e}")
     def set_elided_text(self, label, text, max_width=300):
@@ -503,50 +682,25 @@ class MockupBuddy(QMainWindow):
         elided = metrics.elidedText(text, Qt.ElideMiddle, max_width)
         label.setText(elided)
         label.setToolTip(text)  # Optional: show full path on hover
-    def populate_template_checkboxes(self):
-        self.checkbox_vars.clear()
-        for i in reversed(range(self.template_layout.count())):
-            widget = self.template_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        if not self.mockup_folder:
+    def populate_template_list(self):
+        if not (self.mockup_folder and os.path.isdir(self.mockup_folder)):
+            self.template_model.clear()
             return
 
         files = sorted(f for f in os.listdir(self.mockup_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg')))
-        for file in files:
-            row = QWidget()
-            row_layout = QHBoxLayout()
-            row_layout.setContentsMargins(5, 2, 5, 2)
-
-            checkbox = QCheckBox(file)
-            checkbox.setChecked(True)
-
-            dark_toggle = QCheckBox("Dark BG")
-            dark_toggle.setChecked(self.templates.get(file, {}).get("is_dark", False))
-            dark_toggle.stateChanged.connect(
-                lambda _, f=file, chk=dark_toggle: self.update_dark_flag(f, chk.isChecked())
-            )
-
-            row_layout.addWidget(checkbox)
-            row_layout.addStretch()
-            row_layout.addWidget(dark_toggle)
-            row.setLayout(row_layout)
-
-            self.template_layout.addWidget(row)
-            self.checkbox_vars.append((file, checkbox, dark_toggle))
+        dark_flags = {f: self.templates.get(f, {}).get("is_dark", False) for f in files}
+        self.template_model.set_templates(files, dark_flags)
 
     def update_dark_flag(self, filename, is_dark):
-        if filename not in self.templates:
-            self.templates[filename] = {}
-        self.templates[filename]["is_dark"] = is_dark
-        save_templates(self.templates)
+        entry = dict(self.templates.get(filename, {}))
+        entry["is_dark"] = is_dark
+        self.templates.set(filename, entry)
 
     def reload_designs_and_mockups(self):
         if self.design_folder:
             self.populate_dropdown(self.design_dropdown, self.design_folder)
         if self.mockup_folder:
-            self.populate_template_checkboxes()
+            self.populate_template_list()
 
         if self.design_dropdown.count() > 0:
             self.design_dropdown.setCurrentIndex(0)
@@ -562,121 +716,205 @@ class MockupBuddy(QMainWindow):
 
         if self.design_dropdown.currentText() and self.mockup_dropdown.currentText():
             self.update_preview()
+        self.memory_snapshot("after reload")
     
     
-    from collections import defaultdict
+    def current_render_params(self):
+        return RenderParams(
+            size=self.size_slider.value(),
+            opacity=self.opacity_slider.value(),
+            x_offset=self.x_offset_slider.value(),
+            y_offset=self.y_offset_slider.value(),
+        )
 
     def generate_mockups(self):
-        all_files = sorted([f for f in os.listdir(self.design_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg'))])
-        design_groups = defaultdict(list)
-        for f in all_files:
-            base = get_design_basename(f)
-            design_groups[base].append(f)
+        if self.batch_worker is not None:
+            return
+        if not (self.design_folder and self.mockup_folder and self.output_folder):
+            QMessageBox.warning(self, "Folders Missing", "Please select design, mockup and output folders first.")
+            return
+        selected_mockups = self.template_model.selected_templates()
+        if not selected_mockups:
+            QMessageBox.warning(self, "No Mockups Selected", "Please check at least one mockup template.")
+            return
 
+        from MockupBuddy.batch import plan_batch
+        from MockupBuddy.journal import BatchJournal
+        try:
+            plan = plan_batch(
+                self.design_folder, self.mockup_folder, self.output_folder,
+                selected_mockups, self.current_render_params(), self.move_completed
+            )
+            journal = BatchJournal.start(plan)
+        except OSError as e:
+            self.log(f"❌ Could not start the batch: {e}")
+            QMessageBox.critical(self, "Cannot Start Batch", f"Could not prepare the batch:\n{e}")
+            return
+        self.start_batch(plan, journal)
+
+    def resume_last_batch(self):
+        if self.batch_worker is not None:
+            return
+        from MockupBuddy.journal import BatchJournal, find_incomplete, read_journal
+        path = find_incomplete(self.output_folder) if self.output_folder else None
+        if not path:
+            QMessageBox.information(self, "Nothing to Resume", "There is no interrupted batch in the output folder.")
+            self.update_resume_button()
+            return
+        try:
+            state = read_journal(path)
+            journal = BatchJournal.reopen(path)
+        except (OSError, ValueError, KeyError) as e:
+            self.log(f"❌ Could not resume {os.path.basename(path)}: {e}")
+            QMessageBox.critical(self, "Cannot Resume Batch", f"Could not reopen the batch journal:\n{e}")
+            return
+        self.log(f"⏯ Resuming {os.path.basename(path)}: {len(state.done)} of {len(state.plan.jobs)} jobs already done")
+        self.start_batch(state.plan, journal, done=state.done)
+
+    def update_resume_button(self):
+        from MockupBuddy.journal import find_incomplete  # pulls in the batch code; not needed before first paint
+        self.resume_button.setEnabled(
+            self.batch_worker is None and bool(self.output_folder and find_incomplete(self.output_folder))
+        )
+
+    def start_batch(self, plan, journal, done=()):
+        """Runs the batch on a worker thread behind a non-modal progress popup."""
         popup = QDialog(self)
         popup.setWindowTitle("Generating Mockups")
-        popup.setFixedSize(500, 160)
+        popup.setFixedSize(500, 180)
         layout = QVBoxLayout(popup)
-        label = QLabel("Starting...")
-        progress = QProgressBar()
-        progress.setRange(0, len(design_groups))
-        layout.addWidget(label)
-        layout.addWidget(progress)
+        self.batch_label = QLabel("Starting...")
+        self.batch_progress = QProgressBar()
+        self.batch_progress.setRange(0, max(1, len(plan.jobs)))
+        self.pause_button = QPushButton("⏸ Pause")
+        self.pause_button.clicked.connect(self.toggle_batch_pause)
+        self.cancel_button = QPushButton("⏹ Cancel")
+        self.cancel_button.clicked.connect(self.cancel_batch)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.pause_button)
+        buttons.addWidget(self.cancel_button)
+        layout.addWidget(self.batch_label)
+        layout.addWidget(self.batch_progress)
+        layout.addLayout(buttons)
+        self.batch_popup = popup
         popup.show()
         popup.raise_()
         popup.activateWindow()
 
-        mockup_count = 0
-        unique_basenames = set()
-
-        for i, (base_name, variant_files) in enumerate(design_groups.items()):
-            max_name_length = 35
-            ellipsis = "..." if len(base_name) > max_name_length else ""
-            truncated_base = base_name[:max_name_length] + ellipsis
-
-            for variant in variant_files:
-                label.setText(f"Creating mockups for {truncated_base} ({i + 1} of {len(design_groups)})\n→ Variant: {variant}")
-                progress.setValue(i)
-                popup.repaint()
-                QApplication.processEvents()
-                try:
-                    design_path = os.path.join(self.design_folder, variant)
-                    base = get_design_basename(variant)
-                    design_is_dark = is_dark_design(variant)
-                    design_is_light = is_light_design(variant)
-                    design_type = "neutral"
-                    if design_is_dark:
-                        design_type = "dark"
-                    elif design_is_light:
-                        design_type = "light"
-
-                    selected_mockups = [
-                        (file, dark_toggle.isChecked())
-                        for file, checkbox, dark_toggle in self.checkbox_vars
-                        if checkbox.isChecked()
-                    ]
-                    self.log(f"🔍 Generating mockups for design_type={design_type}")
-
-                    if not selected_mockups:
-                        QMessageBox.warning(self, "No Mockups Selected", "Please check at least one mockup template.")
-                        return
-
-                    for mockup_file, is_dark in selected_mockups:
-                        mockup_path = os.path.join(self.mockup_folder, mockup_file)
-                        if not os.path.exists(mockup_path):
-                            continue
-
-                        mockup_img = Image.open(mockup_path).convert("RGBA")
-                        self.log(f"🧩 Mockup template: {mockup_file}, is_dark={is_dark}")
-
-                        if (
-                            (design_type == "dark" and not is_dark) or
-                            (design_type == "light" and is_dark)
-                        ):
-                            self.log(f"⏭ Skipped: {variant} → {mockup_file} (mismatch)")
-                            continue
-                        else:
-                            self.log(f"✔ Matched: {variant} → {mockup_file} (ok)")
-
-                        design_img = Image.open(design_path).convert("RGBA")
-                        new_w, new_h = self.calculate_new_size(design_img)
-
-                        overlay = design_img.resize((new_w, new_h), Image.LANCZOS)
-                        overlay = apply_opacity(overlay, self.opacity_slider.value() / 100.0)
-                        x = (mockup_img.width - new_w) // 2 + self.x_offset_slider.value()
-                        y = (mockup_img.height - new_h) // 2 + self.y_offset_slider.value()
-                        mockup_img.paste(overlay, (x, y), overlay)
-
-                        sanitized_base = re.sub(r'\s+', '_', base.strip().lower())
-                        color_part = mockup_file.replace(".png", "")
-                        out_dir = os.path.join(self.output_folder, f"Mockups - {sanitized_base}")
-                        os.makedirs(out_dir, exist_ok=True)
-                        out_name = f"{sanitized_base}_{color_part}.png"
-                        out_path = os.path.join(out_dir, out_name)
-                        mockup_img.save(out_path)
-                        self.log(f"✔ Saved: {out_name}")
-                        mockup_count += 1
-                        unique_basenames.add(base)
-
-                    if self.move_completed:
-                        completed_dir = os.path.join(self.design_folder, "Completed Designs")
-                        os.makedirs(completed_dir, exist_ok=True)
-                        os.rename(design_path, os.path.join(completed_dir, variant))
-
-                except Exception as e:
-                    self.log(f"Error with {variant}: {e}")
-
-        progress.setValue(len(design_groups))
-        label.setText(f"✅ {mockup_count} Mockups created for {len(unique_basenames)} Design(s).")
+        # The batch stack is only imported once a batch runs, keeping it off the startup path
+        from MockupBuddy.hashing import ContentHasher
+        from MockupBuddy.render_cache import RenderCache
+        from MockupBuddy.tracing import TraceRecorder
+        from MockupBuddy.worker import BatchWorker
+
+        render_cache = hasher = None
+        dedupe = self.config.get("dedupe", False)
+        if self.config.get("render_cache", False):
+            render_cache = RenderCache(
+                os.path.join(CACHE_DIR, "renders"),
+                max_bytes=int(self.config.get("render_cache_gb", RENDER_CACHE_GB) * 1024 ** 3)
+            )
+        if render_cache is not None or dedupe:
+            hasher = ContentHasher(os.path.join(CACHE_DIR, "content_hashes.json"))
+
+        timing = self.config.get("timing_report", False)
+        self.batch_worker = BatchWorker(
+            plan, journal, done=done, parent=self,
+            profiler=self.profiler if self.profiler.wants("batch") else None,
+            open_template=lambda path: self.open_template(path, log=print),  # runs off the GUI thread
+            pyramids=self.pyramids, render_cache=render_cache, hasher=hasher, dedupe=dedupe,
+            workers=self.config.get("workers", max(1, min(4, (os.cpu_count() or 2) // 2))),
+            memory_budget=int(self.config.get("memory_budget_mb", 0)) * 1024 ** 2 or None,
+            timings=StageTimings() if timing else None,
+            trace=TraceRecorder() if timing else None
+        )
+        self.batch_worker.log.connect(self.log)
+        self.batch_worker.progress.connect(self.on_batch_progress)
+        self.batch_worker.finished.connect(self.on_batch_finished)
+        self.batch_worker.failed.connect(self.on_batch_failed)
+        self.batch_worker.start()
+        self.generate_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
+
+    def on_batch_progress(self, snapshot):
+        if self.batch_worker is None or self.batch_worker.control.cancelled:
+            return
+        self.batch_progress.setValue(snapshot.done)
+        if self.batch_worker.control.paused:
+            self.batch_label.setText(f"Paused (mockups already rendering will finish)\n{snapshot.describe()}")
+            return
+        max_name_length = 35
+        variant = snapshot.current
+        ellipsis = "..." if len(variant) > max_name_length else ""
+        self.batch_label.setText(f"Creating mockups for {variant[:max_name_length]}{ellipsis}\n{snapshot.describe()}")
+
+    def toggle_batch_pause(self):
+        if self.batch_worker is None:
+            return
+        if self.batch_worker.control.paused:
+            self.batch_worker.resume()
+            self.pause_button.setText("⏸ Pause")
+        else:
+            self.batch_worker.pause()
+            self.pause_button.setText("▶ Resume")
+
+    def cancel_batch(self):
+        if self.batch_worker is None:
+            return
+        self.batch_worker.cancel()
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+        self.batch_label.setText("Cancelling after the current mockups...")
+
+    def _end_batch(self, message):
+        self.batch_worker.wait()
+        self.batch_worker.deleteLater()
+        self.batch_worker = None
+        self.pause_button.hide()
+        self.cancel_button.hide()
+        self.batch_label.setText(message)
         close_button = QPushButton("Close")
-        close_button.clicked.connect(popup.accept)
-        layout.addWidget(close_button)
-        popup.repaint()
-        save_templates(self.templates)
-        
+        close_button.clicked.connect(self.batch_popup.accept)
+        self.batch_popup.layout().addWidget(close_button)
+        self.generate_button.setEnabled(True)
+        self.templates.flush()
+        self.update_resume_button()
+
+    def on_batch_failed(self, error):
+        self.log(f"❌ Batch stopped: {error}")
+        self._end_batch(f"❌ Batch stopped: {error}\nUse Resume to continue it.")
+
+    def on_batch_finished(self, result):
+        snapshot = self.batch_worker.tracker.snapshot()
+        self.batch_progress.setValue(snapshot.done)
+        written = result.created + result.cached + result.deduplicated + result.resumed
+        message = f"✅ {written} Mockups created for {len(result.bases)} Design(s)."
+        if result.up_to_date:
+            message = f"✅ {result.up_to_date} up to date, {written} rebuilt for {len(result.bases)} Design(s)."
+        if result.cancelled:
+            message = f"⏹ Cancelled after {written} Mockups. Use Resume to finish the batch."
+        if result.unchanged:
+            message += f"\n= {result.unchanged} re-rendered identically and left untouched."
+        if result.deduplicated:
+            message += f"\n🧬 {result.deduplicated} duplicates copied instead of rendered."
+        if result.cached:
+            message += f"\n♻️ {result.cached} reused from the render cache."
+        if result.resumed:
+            message += f"\n⏯ {result.resumed} were already done before resuming."
+        if result.failed:
+            message += f"\n⚠️ {result.failed} failed (see debug log)."
+        message += f"\n⏱ {format_duration(snapshot.elapsed)} at {snapshot.rate:.1f} img/s"
+        self._end_batch(message)
+        self.memory_snapshot("after batch")
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window = MockupBuddy()
-    window.show()
+    profiler = Profiler(scopes=("startup", "preview", "batch") if "--profile" in sys.argv else None)
+    diagnostics = MemoryDiagnostics(enabled=True if "--memory-diagnostics" in sys.argv else None)
+    with profiler.profile("startup") as startup_run:
+        window = MockupBuddy(profiler, diagnostics)
+        window.show()
+    if startup_run and startup_run.path:
+        window.log(f"🔬 Startup profile ({startup_run.seconds * 1000:.0f} ms) saved to {startup_run.path}")
     sys.exit(app.exec())
\ No newline at end of file
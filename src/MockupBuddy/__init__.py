@@ -0,0 +1,77 @@
+"""
+MockupBuddy: batch apparel mockups from transparent designs and shirt templates.
+
+The package is usable as a library without Qt: only models.py, worker.py
+(BatchWorker) and the desktop app import PySide6, and the rest needs
+nothing beyond Pillow (NumPy optionally, for TemplateStore.open_array).
+The names below are loaded on first access, so `import MockupBuddy`
+itself costs almost nothing:
+
+    import MockupBuddy as mb
+
+    mb.get_design_type("cat-Dark.png")                        # "dark"
+    img = mb.render_file("cat.png", "black_tee.png", mb.RenderParams(size=500))
+    plan = mb.plan_batch(designs, templates, out, [("black_tee.png", True)], mb.RenderParams())
+    mb.run_batch(plan, workers=4)
+"""
+
+import importlib
+
+__version__ = "0.8.1"
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    # naming / pairing rules
+    "normalize_text": "naming",
+    "normalize_name": "naming",
+    "is_light_design": "naming",
+    "is_dark_design": "naming",
+    "get_design_basename": "naming",
+    "get_design_type": "naming",
+    "is_compatible": "naming",
+    "get_output_name": "naming",
+    # rendering
+    "RenderParams": "render",
+    "OUTPUT_FORMATS": "render",
+    "apply_opacity": "render",
+    "open_template": "render",
+    "render_mockup": "render",
+    "render_file": "render",
+    "encode_image": "render",
+    "build_pyramid": "pyramid",
+    "resize_from_pyramid": "pyramid",
+    # batches
+    "Job": "batch",
+    "BatchPlan": "batch",
+    "BatchResult": "batch",
+    "list_images": "batch",
+    "plan_batch": "batch",
+    "run_batch": "batch",
+    "find_duplicate_jobs": "batch",
+    "BatchJournal": "journal",
+    "read_journal": "journal",
+    "find_incomplete": "journal",
+    # catalog and caches
+    "NameIndex": "search",
+    "TemplateStore": "template_store",
+    "PyramidCache": "pyramid",
+    "FingerprintIndex": "fingerprint",
+    "ContentHasher": "hashing",
+    "RenderCache": "render_cache",
+    "SettingsStore": "settings",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,613 @@
+"""
+Batch generation: planning design x template jobs and running them.
+
+Nothing here touches Qt. The GUI builds a plan from its folders, ticked
+templates and sliders, then hands it to run_batch() with callbacks for
+logging and progress.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass, field
+
+from .fingerprint import FingerprintIndex
+from .hashing import ContentHasher
+from .memory import DimensionCatalog, MemoryBudget, RssHighWater, default_budget, estimate_job_bytes, peak_rss
+from .naming import get_design_basename, get_design_type, get_output_name, is_compatible
+from .pyramid import PyramidCache
+from .render import RenderParams, encode_image, open_template, render_mockup
+from .render_cache import materialize
+from .timing import format_stages, span
+from .writer import same_file_contents, write_if_changed
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+COMPLETED_DIR = "Completed Designs"
+
+
+def list_images(folder):
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+
+@dataclass
+class Job:
+    """One design variant rendered onto one template."""
+    id: int
+    design: str
+    template: str
+    out_path: str
+
+    def to_dict(self):
+        return {"id": self.id, "design": self.design, "template": self.template, "out_path": self.out_path}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["design"], data["template"], data["out_path"])
+
+
+@dataclass
+class BatchPlan:
+    design_folder: str
+    template_folder: str
+    output_folder: str
+    params: RenderParams
+    move_completed: bool
+    groups: list  # [(design base, [variant file, ...]), ...] in run order
+    jobs: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)  # [(variant, template)] rejected by pairing rules
+    output_format: str = "png"
+
+    def jobs_by_design(self):
+        by_design = defaultdict(list)
+        for job in self.jobs:
+            by_design[job.design].append(job)
+        return by_design
+
+    def to_dict(self, include_jobs=True):
+        data = {
+            "design_folder": self.design_folder,
+            "template_folder": self.template_folder,
+            "output_folder": self.output_folder,
+            "params": self.params.to_dict(),
+            "move_completed": self.move_completed,
+            "groups": [[base, list(variants)] for base, variants in self.groups],
+            "skipped": [list(pair) for pair in self.skipped],
+            "output_format": self.output_format,
+        }
+        if include_jobs:
+            data["jobs"] = [job.to_dict() for job in self.jobs]
+        return data
+
+    @classmethod
+    def from_dict(cls, data, jobs=None):
+        if jobs is None:
+            jobs = [Job.from_dict(j) for j in data.get("jobs", [])]
+        return cls(
+            design_folder=data["design_folder"],
+            template_folder=data["template_folder"],
+            output_folder=data["output_folder"],
+            params=RenderParams.from_dict(data["params"]),
+            move_completed=data["move_completed"],
+            groups=[(base, list(variants)) for base, variants in data["groups"]],
+            jobs=jobs,
+            skipped=[tuple(pair) for pair in data.get("skipped", [])],
+            output_format=data.get("output_format", "png"),
+        )
+
+
+@dataclass
+class BatchResult:
+    created: int = 0
+    failed: int = 0
+    resumed: int = 0  # jobs already completed by an earlier, interrupted run
+    up_to_date: int = 0  # outputs whose inputs have not changed since they were written
+    cached: int = 0  # outputs materialized from the render cache instead of rendered
+    unchanged: int = 0  # rendered outputs identical to the file already on disk, left untouched
+    deduplicated: int = 0  # outputs copied from an identical job instead of rendered
+    moved: int = 0
+    bases: set = field(default_factory=set)  # design bases with at least one output
+    cancelled: bool = False  # stopped early by BatchControl.cancel(); the journal is left open for resume
+    peak_rss: int = 0  # bytes; highest RSS sampled during the batch (process-wide peak where unavailable)
+    peak_reserved: int = 0  # bytes; highest sum of job estimates in flight at once, plus the pyramid cache
+
+    def summary(self):
+        return {"created": self.created, "failed": self.failed, "resumed": self.resumed,
+                "up_to_date": self.up_to_date, "cached": self.cached,
+                "unchanged": self.unchanged, "deduplicated": self.deduplicated, "moved": self.moved, "designs": len(self.bases),
+                "peak_rss_mb": round(self.peak_rss / 1024 ** 2, 1), "peak_reserved_mb": round(self.peak_reserved / 1024 ** 2, 1)}
+
+
+class BatchCancelled(Exception):
+    pass
+
+
+class BatchControl:
+    """Pause/resume/cancel switch for a running batch. Safe to flip from any thread."""
+
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+
+    def wait(self, timeout=None):
+        """Blocks while paused (up to timeout). Returns True once running or cancelled."""
+        return self._running.wait(timeout)
+
+
+def plan_batch(design_folder, template_folder, output_folder, templates, params, move_completed=True,
+               output_format="png"):
+    """
+    Pairs every design in design_folder with each selected template it is
+    compatible with. `templates` is [(file, is_dark), ...] and output_format
+    one of render.OUTPUT_FORMATS.
+    """
+    groups = defaultdict(list)
+    for f in list_images(design_folder):
+        groups[get_design_basename(f)].append(f)
+
+    templates = [(f, is_dark) for f, is_dark in templates if os.path.exists(os.path.join(template_folder, f))]
+    plan = BatchPlan(design_folder, template_folder, output_folder, params, move_completed, list(groups.items()),
+                     output_format=output_format)
+    for base, variants in plan.groups:
+        for variant in variants:
+            design_type = get_design_type(variant)
+            for template, is_dark in templates:
+                if not is_compatible(design_type, is_dark):
+                    plan.skipped.append((variant, template))
+                    continue
+                out_dir, out_name = get_output_name(base, template, output_format)
+                out_path = os.path.join(output_folder, out_dir, out_name)
+                plan.jobs.append(Job(len(plan.jobs), variant, template, out_path))
+    return plan
+
+
+def find_duplicate_jobs(plan, hasher):
+    """
+    Maps job id -> id of the first job with byte-identical design and template
+    inputs, for every job that duplicates an earlier one. Only files whose
+    size matches another input's are hashed, since nothing else can be a
+    duplicate.
+    """
+    design_paths = {job.design: _locate_design(plan, job.design)[0] for job in plan.jobs}
+    template_paths = {job.template: os.path.join(plan.template_folder, job.template) for job in plan.jobs}
+
+    def content_ids(paths):
+        by_size = defaultdict(list)
+        for name, path in paths.items():
+            try:
+                by_size[os.path.getsize(path)].append(name)
+            except OSError:
+                continue
+        ids = {}
+        for size, names in by_size.items():
+            for name in names:
+                ids[name] = hasher.digest(paths[name]) if len(names) > 1 else (size, name)
+        return ids
+
+    design_ids = content_ids(design_paths)
+    template_ids = content_ids(template_paths)
+    first = {}
+    duplicates = {}
+    for job in plan.jobs:
+        if job.design not in design_ids or job.template not in template_ids:
+            continue
+        key = (design_ids[job.design], template_ids[job.template])
+        canonical = first.setdefault(key, job.id)
+        if canonical != job.id:
+            duplicates[job.id] = canonical
+    return duplicates
+
+
+def _locate_design(plan, variant):
+    """Returns (path, already_moved). A resumed batch may find the design in Completed Designs."""
+    path = os.path.join(plan.design_folder, variant)
+    if os.path.exists(path):
+        return path, False
+    moved_path = os.path.join(plan.design_folder, COMPLETED_DIR, variant)
+    if os.path.exists(moved_path):
+        return moved_path, True
+    return path, False
+
+
+@dataclass
+class _RunContext:
+    journal: object
+    log: object
+    on_job: object
+    open_template: object
+    pyramids: PyramidCache
+    fingerprints: FingerprintIndex
+    render_cache: object
+    hasher: object
+    force: bool
+    control: object = None
+    memory: MemoryBudget = None
+    dimensions: DimensionCatalog = None
+    rss: RssHighWater = None
+    timings: object = None
+    trace: object = None
+    duplicates: dict = field(default_factory=dict)  # job id -> id of the identical job it copies
+    ready: dict = field(default_factory=dict)  # job id -> out path known to be valid this run
+    finished: dict = field(default_factory=dict)  # job id -> Event, for jobs that duplicates wait on
+
+
+@dataclass
+class _DesignState:
+    """Bookkeeping for one design variant while its jobs are in flight."""
+    base: str
+    variant: str
+    path: str
+    already_moved: bool
+    pending: int = 0
+    submitted: bool = False
+    all_ok: bool = True
+
+
+def run_batch(plan, journal=None, done=(), log=print, progress=None, on_job=None, open_template=open_template,
+              pyramids=None, fingerprints=None, force=False, render_cache=None, hasher=None, dedupe=False,
+              workers=1, control=None, memory_budget=None, timings=None, trace=None):
+    """
+    Renders every job in the plan and returns a BatchResult.
+
+    Job ids in `done` whose output file still exists are skipped, which is how
+    an interrupted batch resumes. Unless `force` is set, jobs whose output
+    exists with an unchanged input fingerprint are skipped as well, without
+    decoding anything. With a RenderCache, renders are looked up by input
+    content first and materialized from the cache. With `dedupe`, jobs whose
+    design and template are byte-identical to an earlier job's are reflinked or
+    copied from that job's output instead of rendered. A design is moved to
+    "Completed Designs" once all of its jobs succeeded (when the plan asks
+    for it).
+
+    With workers > 1 jobs render on a thread pool; all bookkeeping (journal,
+    logging, callbacks, moves) still happens on the calling thread. Jobs are
+    only handed to the pool while their estimated peak memory, plus the
+    pyramid cache's max_bytes, fits `memory_budget` bytes (default: half of
+    physical memory).
+
+    With a timing.StageTimings as `timings`, every job's stages are timed
+    and a JSON + CSV report is written under <output>/.mockupbuddy/reports.
+    A tracing.TraceRecorder as `trace` gets the same spans per worker thread
+    plus queue-depth counters, saved there as a Chrome trace-event file.
+    `progress(group_index, group_count, base, variant)` is called as each
+    design variant is started and `on_job(job, outcome, error)` as each job
+    finishes (outcome "resumed" for jobs skipped via `done`).
+
+    A BatchControl passed as `control` can pause the batch between jobs or
+    cancel it. Jobs already rendering finish and are recorded; the result
+    comes back with cancelled=True and the journal is not marked finished,
+    so the batch can be resumed later.
+    """
+    if (render_cache is not None or dedupe) and hasher is None:
+        hasher = ContentHasher()
+    ctx = _RunContext(
+        journal=journal,
+        log=log,
+        on_job=on_job,
+        open_template=open_template,
+        pyramids=pyramids or PyramidCache(max_target=plan.params.size),
+        fingerprints=fingerprints or FingerprintIndex(plan.output_folder),
+        render_cache=render_cache,
+        hasher=hasher,
+        force=force,
+        control=control,
+        memory=MemoryBudget(memory_budget or default_budget()),
+        dimensions=DimensionCatalog(),
+        rss=RssHighWater(),
+        timings=timings,
+        trace=trace,
+    )
+    # decoded pyramids stay cached between jobs, up to max_bytes, on top of what each job holds
+    ctx.memory.acquire(ctx.pyramids.max_bytes)
+    result = BatchResult()
+    try:
+        if dedupe:
+            ctx.duplicates = find_duplicate_jobs(plan, hasher)
+            ctx.finished = {job_id: threading.Event() for job_id in set(ctx.duplicates.values())}
+            if ctx.duplicates:
+                log(f"🧬 {len(ctx.duplicates)} of {len(plan.jobs)} jobs duplicate another job's inputs and will be copied")
+        _run_groups(plan, ctx, done, progress, result, workers)
+    except BatchCancelled:
+        result.cancelled = True
+        log("⏹ Batch cancelled")
+    finally:
+        # Best effort: a full disk or read-only output must not mask the batch's own result or error
+        try:
+            ctx.fingerprints.save()
+        except OSError as e:
+            log(f"⚠️ Could not save output fingerprints: {e}")
+        if hasher is not None:
+            try:
+                hasher.save()
+            except OSError as e:
+                log(f"⚠️ Could not save content hashes: {e}")
+        if render_cache is not None:
+            try:
+                render_cache.evict()
+            except OSError as e:
+                log(f"⚠️ Could not trim the render cache: {e}")
+        result.peak_rss = ctx.rss.peak or peak_rss() or 0
+        result.peak_reserved = ctx.memory.peak
+        if timings is not None and timings.jobs:
+            _write_timing_report(plan, timings, journal, log)
+        if trace is not None:
+            _write_trace(plan, trace, journal, log)
+        log(f"📈 Peak memory {result.peak_rss / 1024 ** 2:.0f} MB "
+            f"(job estimates plus the {ctx.pyramids.max_bytes / 1024 ** 2:.0f} MB pyramid cache peaked at "
+            f"{result.peak_reserved / 1024 ** 2:.0f} MB of a {ctx.memory.limit / 1024 ** 2:.0f} MB budget)")
+
+    if journal and not result.cancelled:
+        journal.finish(result.summary())
+    return result
+
+
+def _write_timing_report(plan, timings, journal, log):
+    stem = os.path.splitext(os.path.basename(journal.path))[0] if journal else None
+    try:
+        json_path, _ = timings.write(plan.output_folder, stem)
+    except OSError as e:
+        log(f"⚠️ Could not write timing report: {e}")
+        return
+    stages = timings.report()["stages"]
+    totals = {name: entry["total"] for name, entry in stages.items() if name != "total"}
+    log(f"⏱ Stage totals: {format_stages(totals)} → {json_path}")
+
+
+def _write_trace(plan, trace, journal, log):
+    stem = os.path.splitext(os.path.basename(journal.path))[0] if journal else None
+    try:
+        path = trace.write(plan.output_folder, stem)
+    except OSError as e:
+        log(f"⚠️ Could not write trace: {e}")
+        return
+    log(f"🧵 Trace written to {path} (open in ui.perfetto.dev or chrome://tracing)")
+
+
+def _run_groups(plan, ctx, done, progress, result, workers):
+    by_design = plan.jobs_by_design()
+    skipped = defaultdict(list)
+    for variant, template in plan.skipped:
+        skipped[variant].append(template)
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+    window = workers * 2  # jobs in flight at once, so memory use stays bounded
+    inflight = {}
+
+    def record_queue():
+        if ctx.trace is not None:
+            ctx.trace.counter("queue", in_flight=len(inflight))
+            ctx.trace.counter("memory reserved (MB)", reserved=round(ctx.memory.in_use / 1024 ** 2, 1))
+
+    def drain():
+        with ctx.trace.span("wait for workers") if ctx.trace is not None else nullcontext():
+            finished, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+        for future in finished:
+            job, state = inflight.pop(future)
+            if not future.cancelled():
+                _complete_job(plan, ctx, result, state, job, *future.result())
+        record_queue()
+
+    def checkpoint():
+        control = ctx.control
+        if control is None:
+            return
+        while control.paused:
+            # keep recording jobs that were already in flight when the pause came
+            if inflight:
+                drain()
+            else:
+                control.wait(0.2)
+        if control.cancelled:
+            raise BatchCancelled()
+
+    try:
+        for group_index, (base, variants) in enumerate(plan.groups):
+            for variant in variants:
+                if progress:
+                    progress(group_index, len(plan.groups), base, variant)
+                design_path, already_moved = _locate_design(plan, variant)
+                state = _DesignState(base, variant, design_path, already_moved)
+                ctx.log(f"🔍 Generating mockups for {variant} (design_type={get_design_type(variant)})")
+                for template in skipped[variant]:
+                    ctx.log(f"⏭ Skipped: {variant} → {template} (mismatch)")
+
+                for job in by_design.get(variant, []):
+                    if job.id in done and os.path.exists(job.out_path):
+                        result.resumed += 1
+                        result.bases.add(base)
+                        ctx.ready[job.id] = job.out_path
+                        if job.id in ctx.finished:
+                            ctx.finished[job.id].set()
+                        if ctx.on_job:
+                            ctx.on_job(job, "resumed", None)
+                        continue
+                    checkpoint()
+                    state.pending += 1
+                    nbytes = _estimate_job(plan, ctx, job, design_path, first=job is by_design[variant][0])
+                    if pool is None:
+                        ctx.memory.acquire(nbytes)  # keeps the peak estimate
+                        _complete_job(plan, ctx, result, state, job, *_attempt_job(plan, ctx, job, design_path, nbytes))
+                        continue
+                    while inflight and (len(inflight) >= window or not ctx.memory.try_acquire(nbytes)):
+                        drain()
+                    if not inflight:
+                        ctx.memory.acquire(nbytes)  # runs alone, even if bigger than the budget
+                    inflight[pool.submit(_attempt_job, plan, ctx, job, design_path, nbytes)] = (job, state)
+                    record_queue()
+
+                state.submitted = True
+                if state.pending == 0:
+                    _finish_design(plan, ctx, result, state)
+        while inflight:
+            drain()
+    except BatchCancelled:
+        for future in inflight:
+            future.cancel()
+        while inflight:
+            drain()
+        raise
+    finally:
+        if pool is not None:
+            for future in inflight:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+
+def _estimate_job(plan, ctx, job, design_path, first):
+    template_size = ctx.dimensions.get(os.path.join(plan.template_folder, job.template))
+    design_size = ctx.dimensions.get(design_path) if first else None
+    return estimate_job_bytes(template_size, design_size, plan.params.size, decodes_design=first)
+
+
+def _attempt_job(plan, ctx, job, design_path, nbytes=0):
+    """Runs one job, returning (outcome, error). Safe to call from a worker thread."""
+    try:
+        if ctx.timings is None and ctx.trace is None:
+            outcome = _run_job(plan, ctx, job, design_path)
+        else:
+            label = os.path.relpath(job.out_path, plan.output_folder)
+            with ExitStack() as stack:
+                if ctx.timings is not None:
+                    stack.enter_context(ctx.timings.job(label))
+                if ctx.trace is not None:
+                    stack.enter_context(ctx.trace.job(label, id=job.id))
+                outcome = _run_job(plan, ctx, job, design_path)
+        ctx.ready[job.id] = job.out_path
+        return outcome, None
+    except Exception as e:
+        return "failed", e
+    finally:
+        ctx.memory.release(nbytes)
+        event = ctx.finished.get(job.id)
+        if event is not None:
+            event.set()
+
+
+def _complete_job(plan, ctx, result, state, job, outcome, error):
+    """Records a finished job. Always runs on the thread that called run_batch()."""
+    name = os.path.basename(job.out_path)
+    if outcome == "failed":
+        state.all_ok = False
+        result.failed += 1
+        ctx.log(f"Error with {job.design} → {job.template}: {error}")
+        if ctx.journal:
+            ctx.journal.record_failed(job, error)
+    else:
+        if outcome == "up_to_date":
+            result.up_to_date += 1
+        elif outcome == "cached":
+            result.cached += 1
+            ctx.log(f"♻️ From cache: {name}")
+        elif outcome == "unchanged":
+            result.unchanged += 1
+            ctx.log(f"= Unchanged: {name}")
+        elif outcome == "deduplicated":
+            result.deduplicated += 1
+            ctx.log(f"🧬 Copied duplicate: {name}")
+        else:
+            result.created += 1
+            ctx.log(f"✔ Saved: {name}")
+        result.bases.add(state.base)
+        if ctx.journal:
+            ctx.journal.record_done(job)
+    if ctx.on_job:
+        ctx.on_job(job, outcome, error)
+    ctx.rss.sample()
+
+    state.pending -= 1
+    if state.submitted and state.pending == 0:
+        _finish_design(plan, ctx, result, state)
+
+
+def _finish_design(plan, ctx, result, state):
+    if not (plan.move_completed and state.all_ok and not state.already_moved):
+        return
+    try:
+        completed_dir = os.path.join(plan.design_folder, COMPLETED_DIR)
+        os.makedirs(completed_dir, exist_ok=True)
+        os.rename(state.path, os.path.join(completed_dir, state.variant))
+        result.moved += 1
+        if ctx.journal:
+            ctx.journal.record_moved(state.variant)
+    except OSError as e:
+        ctx.log(f"Error moving {state.variant} to {COMPLETED_DIR}: {e}")
+
+
+def _run_job(plan, ctx, job, design_path):
+    """Produces one output. Returns "up_to_date", "cached", "deduplicated", "unchanged" or "rendered"."""
+    template_path = os.path.join(plan.template_folder, job.template)
+    with span("lookup"):
+        fingerprint = ctx.fingerprints.fingerprint(design_path, template_path, plan.params, job.out_path)
+        if not ctx.force and ctx.fingerprints.is_current(job.out_path, fingerprint):
+            return "up_to_date"
+
+    canonical = ctx.duplicates.get(job.id)
+    if canonical is not None:
+        ctx.finished[canonical].wait()
+        source = ctx.ready.get(canonical)
+        if source and os.path.exists(source):
+            ctx.fingerprints.record(job.out_path, fingerprint)
+            with span("write"):
+                if same_file_contents(source, job.out_path):
+                    return "unchanged"
+                materialize(source, job.out_path)
+            return "deduplicated"
+
+    cache_key = None
+    if ctx.render_cache is not None:
+        with span("lookup"):
+            cache_key = ctx.render_cache.key(
+                ctx.hasher.digest(design_path), ctx.hasher.digest(template_path), plan.params, plan.output_format
+            )
+            cached = ctx.render_cache.lookup(cache_key, plan.output_format)
+        if cached:
+            ctx.fingerprints.record(job.out_path, fingerprint)
+            with span("write"):
+                if same_file_contents(cached, job.out_path):
+                    return "unchanged"
+                materialize(cached, job.out_path)
+            return "cached"
+
+    with span("decode"):
+        template_img = ctx.open_template(template_path)
+    try:
+        with span("decode"):
+            design_levels = ctx.pyramids.get(design_path)
+        mockup_img = render_mockup(template_img, design_levels, plan.params)
+        data = encode_image(mockup_img, plan.output_format)
+        ctx.rss.sample()  # template, overlay, mockup and encoded output are all still alive here
+    finally:
+        template_img.close()  # release the decoded pixels now rather than at the next GC
+
+    with span("write"):
+        if cache_key is not None:
+            cached = ctx.render_cache.store(cache_key, plan.output_format, data)
+            written = not same_file_contents(cached, job.out_path)
+            if written:
+                materialize(cached, job.out_path)
+        else:
+            written = write_if_changed(job.out_path, data)
+    ctx.fingerprints.record(job.out_path, fingerprint)
+    return "rendered" if written else "unchanged"
@@ -0,0 +1,235 @@
+"""
+Command-line entry point: `python -m MockupBuddy generate ...`.
+
+Runs a batch without a desktop session. Nothing here (or in the modules it
+uses) imports Qt, so it works on a headless render box. Progress goes to
+stdout as one JSON object per line; human-readable log lines go to stderr.
+
+Exit codes: 0 every job succeeded, 1 some jobs failed, 2 bad arguments or
+folders, 130 interrupted.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .diagnostics import MEMORY_ENV, MemoryDiagnostics
+from .render import OUTPUT_FORMATS, RenderParams
+from .profiling import PROFILE_ENV, Profiler
+from .settings import CACHE_DIR, PROFILE_DIR, RENDER_CACHE_GB, TEMPLATES_PATH, read_json
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m MockupBuddy", description="MockupBuddy mockup generator")
+    commands = parser.add_subparsers(dest="command")
+    gui = commands.add_parser("gui", help="start the desktop app (the default)")
+    gui.add_argument("--profile", action="store_true",
+                     help=f"write cProfile files for startup, previews and batches to {PROFILE_DIR}")
+    gui.add_argument("--memory-diagnostics", action="store_true",
+                     help=f"snapshot memory after reloads, previews and batches; report in {PROFILE_DIR}")
+
+    generate = commands.add_parser("generate", help="render mockups without the GUI")
+    generate.add_argument("--designs", required=True, help="folder of design PNGs")
+    generate.add_argument("--templates", required=True, help="folder of mockup templates")
+    generate.add_argument("--output", required=True, help="folder mockups are written to")
+    generate.add_argument("--templates-json", default=TEMPLATES_PATH,
+                          help="template settings saved by the GUI, used for dark flags (default: %(default)s)")
+    generate.add_argument("--dark", action="append", default=[], metavar="TEMPLATE",
+                          help="treat TEMPLATE as a dark shirt (repeatable)")
+    generate.add_argument("--light", action="append", default=[], metavar="TEMPLATE",
+                          help="treat TEMPLATE as a light shirt (repeatable)")
+    generate.add_argument("--use", action="append", default=[], metavar="TEMPLATE",
+                          help="only use these templates (repeatable; default: all in --templates)")
+    generate.add_argument("--size", type=int, default=RenderParams.size)
+    generate.add_argument("--opacity", type=int, default=RenderParams.opacity)
+    generate.add_argument("--x-offset", type=int, default=RenderParams.x_offset)
+    generate.add_argument("--y-offset", type=int, default=RenderParams.y_offset)
+    generate.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="png", dest="output_format")
+    generate.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    generate.add_argument("--memory-budget", type=int, default=0, metavar="MB",
+                          help="cap on the estimated memory of renders in flight plus the pyramid cache "
+                               "(default: half of RAM)")
+    generate.add_argument("--move-completed", action="store_true",
+                          help="move designs to 'Completed Designs' once all their mockups are made")
+    generate.add_argument("--resume", action="store_true",
+                          help="continue the interrupted batch in --output instead of planning a new one")
+    generate.add_argument("--force", action="store_true", help="re-render outputs that look up to date")
+    generate.add_argument("--dedupe", action="store_true", help="render byte-identical design/template pairs once and copy the result")
+    generate.add_argument("--render-cache", action="store_true", help=f"use the render cache in {CACHE_DIR}")
+    generate.add_argument("--render-cache-gb", type=float, default=RENDER_CACHE_GB, metavar="GB",
+                          help="disk budget of the render cache; older entries are evicted past it (default: %(default)s)")
+    generate.add_argument("--template-store", action="store_true",
+                          help=f"keep decoded templates memory-mapped in {CACHE_DIR}")
+    generate.add_argument("--timing-report", action="store_true",
+                          help="time each render stage and write a JSON/CSV report under --output")
+    generate.add_argument("--trace", action="store_true",
+                          help="write a Chrome trace-event timeline (ui.perfetto.dev) under --output")
+    generate.add_argument("--profile", action="store_true", help=f"write a cProfile file for the batch to {PROFILE_DIR}")
+    generate.add_argument("--memory-diagnostics", action="store_true",
+                          help=f"snapshot memory before and after the batch; report in {PROFILE_DIR}")
+    generate.add_argument("--quiet", action="store_true", help="no log lines on stderr")
+    return parser
+
+
+def emit(event, **fields):
+    sys.stdout.write(json.dumps({"event": event, **fields}) + "\n")
+    sys.stdout.flush()
+
+
+def resolve_templates(args):
+    """Returns [(file, is_dark)] for the templates to use, or raises ValueError."""
+    from .batch import list_images
+
+    files = list_images(args.templates)
+    if args.use:
+        missing = sorted(set(args.use) - set(files))
+        if missing:
+            raise ValueError(f"templates not found in {args.templates}: {', '.join(missing)}")
+        files = [f for f in files if f in set(args.use)]
+    saved = read_json(args.templates_json, {}) if args.templates_json else {}
+    if not isinstance(saved, dict):
+        saved = {}
+    dark, light = set(args.dark), set(args.light)
+    templates = []
+    for f in files:
+        entry = saved.get(f)
+        is_dark = entry.get("is_dark", False) if isinstance(entry, dict) else False
+        if f in dark:
+            is_dark = True
+        elif f in light:
+            is_dark = False
+        templates.append((f, is_dark))
+    return templates
+
+
+def generate(args):
+    # Imported here rather than at the top so launching the desktop app through main() stays quick
+    from .batch import plan_batch, run_batch
+    from .hashing import ContentHasher
+    from .journal import BatchJournal, find_incomplete, read_journal
+    from .progress import ProgressTracker
+    from .pyramid import PyramidCache
+    from .render_cache import RenderCache
+    from .template_store import TemplateStore
+    from .timing import StageTimings
+    from .tracing import TraceRecorder
+
+    log = (lambda message: None) if args.quiet else (lambda message: print(message, file=sys.stderr, flush=True))
+    for folder in (args.designs, args.templates):
+        if not os.path.isdir(folder):
+            log(f"❌ Not a folder: {folder}")
+            return EXIT_USAGE
+    if args.workers < 1:
+        log("❌ --workers must be at least 1")
+        return EXIT_USAGE
+    if args.render_cache_gb <= 0:
+        log("❌ --render-cache-gb must be more than 0")
+        return EXIT_USAGE
+
+    done = ()
+    if args.resume:
+        path = find_incomplete(args.output)
+        if not path:
+            log(f"❌ No interrupted batch in {args.output}")
+            return EXIT_USAGE
+        try:
+            state = read_journal(path)
+            plan, done = state.plan, state.done
+            journal = BatchJournal.reopen(path)
+        except (OSError, ValueError, KeyError) as e:
+            log(f"❌ Cannot resume {os.path.basename(path)}: {e}")
+            return EXIT_USAGE
+        log(f"⏯ Resuming {os.path.basename(path)}: {len(done)} of {len(plan.jobs)} jobs already done")
+    else:
+        try:
+            templates = resolve_templates(args)
+        except ValueError as e:
+            log(f"❌ {e}")
+            return EXIT_USAGE
+        if not templates:
+            log(f"❌ No templates in {args.templates}")
+            return EXIT_USAGE
+        params = RenderParams(args.size, args.opacity, args.x_offset, args.y_offset)
+        os.makedirs(args.output, exist_ok=True)
+        plan = plan_batch(args.designs, args.templates, args.output, templates, params,
+                          move_completed=args.move_completed, output_format=args.output_format)
+        journal = BatchJournal.start(plan)
+
+    render_cache = hasher = None
+    if args.render_cache:
+        render_cache = RenderCache(os.path.join(CACHE_DIR, "renders"), max_bytes=int(args.render_cache_gb * 1024 ** 3))
+    if args.render_cache or args.dedupe:
+        hasher = ContentHasher(os.path.join(CACHE_DIR, "content_hashes.json"))
+    store = TemplateStore(os.path.join(CACHE_DIR, "templates")) if args.template_store else None
+
+    emit("start", jobs=len(plan.jobs), designs=sum(len(v) for _, v in plan.groups),
+         skipped=len(plan.skipped), resumed=len(done), workers=args.workers, journal=journal.path)
+    started = time.monotonic()
+    tracker = ProgressTracker(len(plan.jobs))
+
+    def on_job(job, outcome, error):
+        tracker.job_finished(outcome)
+        snapshot = tracker.snapshot()
+        fields = {"id": job.id, "design": job.design, "template": job.template, "out_path": job.out_path,
+                  "outcome": outcome, "done": snapshot.done, "total": snapshot.total,
+                  "rate": round(snapshot.rate, 2), "eta": None if snapshot.eta is None else round(snapshot.eta, 1)}
+        if error is not None:
+            fields["error"] = str(error)
+        emit("job", **fields)
+
+    options = {"open_template": store.open} if store else {}
+    pyramids = PyramidCache(max_target=plan.params.size)
+    profiler = Profiler(scopes=("batch",) if args.profile else None)
+    diagnostics = MemoryDiagnostics(enabled=True if args.memory_diagnostics else None)
+    diagnostics.start()
+    diagnostics.snapshot("before batch")
+    try:
+        with profiler.profile("batch", threads=True) as profile_run:
+            result = run_batch(
+                plan, journal=journal, done=done, log=log, on_job=on_job, workers=args.workers,
+                memory_budget=args.memory_budget * 1024 ** 2 or None,
+                timings=StageTimings() if args.timing_report else None,
+                trace=TraceRecorder() if args.trace else None,
+                force=args.force, render_cache=render_cache, hasher=hasher, dedupe=args.dedupe,
+                pyramids=pyramids, **options
+            )
+        if profile_run and profile_run.path:
+            log(f"🔬 Batch profile saved to {profile_run.path}")
+        entry = diagnostics.snapshot("after batch", pyramid_cache_mb=round(pyramids.nbytes / 1024 ** 2, 1),
+                                     pyramid_budget_mb=round(pyramids.max_bytes / 1024 ** 2, 1))
+        if entry:
+            log(f"🧠 {diagnostics.describe(entry)} — report: {diagnostics.path}")
+    except KeyboardInterrupt:
+        emit("end", status="interrupted", journal=journal.path)
+        return EXIT_INTERRUPTED
+    finally:
+        journal.close()
+
+    status = "failed" if result.failed else "ok"
+    emit("end", status=status, seconds=round(time.monotonic() - started, 3), **result.summary())
+    log(f"✅ {result.created} created, {result.up_to_date} up to date, {result.failed} failed "
+        f"for {len(result.bases)} design(s)")
+    return EXIT_FAILED if result.failed else EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "generate":
+        return generate(args)
+
+    import runpy
+    if getattr(args, "profile", False):
+        os.environ[PROFILE_ENV] = "all"
+    if getattr(args, "memory_diagnostics", False):
+        os.environ[MEMORY_ENV] = "1"
+    gui_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MockupBuddy_PySide6_v0.8.1.py")
+    sys.argv = [gui_script]
+    runpy.run_path(gui_script, run_name="__main__")
+    return EXIT_OK
@@ -0,0 +1,129 @@
+"""
+Opt-in memory diagnostics for long sessions.
+
+Set MOCKUPBUDDY_MEMORY=1 or pass --memory-diagnostics to trace Python
+allocations with tracemalloc. The app takes a snapshot at key points (after
+a reload, every SNAPSHOT_EVERY previews, after a batch) and records traced
+and resident memory, the top allocation sites and what grew since the
+previous and the first snapshot, plus whatever cache sizes the caller
+passes in. The report is rewritten after every snapshot to
+PROFILE_DIR/<session>-memory.json, so it survives a crash.
+
+A steady climb in "since_first" across identical work is a leak; cache
+sizes sitting above their budgets are a bug too. Pillow and Qt pixel
+buffers are allocated outside Python's allocator, so they show up in RSS
+but not in the traced figures.
+"""
+
+import os
+import time
+
+from .memory import current_rss, peak_rss
+from .settings import PROFILE_DIR, atomic_write_json
+
+MEMORY_ENV = "MOCKUPBUDDY_MEMORY"
+SNAPSHOT_EVERY = 20  # previews between snapshots
+FRAMES = 10  # traceback depth kept per allocation
+TOP_SITES = 15
+
+_IGNORED = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def enabled_from_env(value):
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _mb(nbytes):
+    return round(nbytes / 1024 ** 2, 3) if nbytes is not None else None
+
+
+def _sites(stats, limit):
+    sites = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        entry = {"site": f"{frame.filename}:{frame.lineno}", "size_mb": _mb(stat.size), "count": stat.count}
+        if hasattr(stat, "size_diff"):
+            entry["size_diff_mb"] = _mb(stat.size_diff)
+            entry["count_diff"] = stat.count_diff
+        sites.append(entry)
+    return sites
+
+
+class MemoryDiagnostics:
+    def __init__(self, directory=PROFILE_DIR, enabled=None, top=TOP_SITES):
+        self.directory = directory
+        self.enabled = enabled_from_env(os.environ.get(MEMORY_ENV)) if enabled is None else enabled
+        self.top = top
+        self.session = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self.path = os.path.join(directory, f"{self.session}-memory.json")
+        self.entries = []
+        self._first = None
+        self._previous = None
+        self._previews = 0
+
+    def start(self):
+        if not self.enabled:
+            return
+        import tracemalloc  # only imported when diagnostics are on, keeping it off the startup path
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(FRAMES)
+
+    def preview_done(self, **extra):
+        """Counts a preview; every SNAPSHOT_EVERY-th one takes a snapshot."""
+        if not self.enabled:
+            return None
+        self._previews += 1
+        if self._previews % SNAPSHOT_EVERY:
+            return None
+        return self.snapshot(f"after {self._previews} previews", **extra)
+
+    def snapshot(self, label, **extra):
+        """
+        Records a snapshot; keyword arguments (cache sizes, budgets, ...)
+        are stored with it. Returns the entry, or None when disabled.
+        """
+        if not self.enabled:
+            return None
+        self.start()
+        import tracemalloc
+
+        ignored = [tracemalloc.Filter(False, pattern) for pattern in (tracemalloc.__file__,) + _IGNORED]
+        snapshot = tracemalloc.take_snapshot().filter_traces(ignored)
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        entry = {
+            "label": label,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "traced_mb": _mb(traced),
+            "traced_peak_mb": _mb(traced_peak),
+            "rss_mb": _mb(current_rss()),
+            "peak_rss_mb": _mb(peak_rss()),
+            **extra,
+            "top": _sites(snapshot.statistics("lineno"), self.top),
+        }
+        if self._previous is not None:
+            entry["since_previous"] = _sites(snapshot.compare_to(self._previous, "lineno"), self.top)
+            entry["since_first"] = _sites(snapshot.compare_to(self._first, "lineno"), self.top)
+        else:
+            self._first = snapshot
+        self._previous = snapshot
+        self.entries.append(entry)
+        self.write()
+        return entry
+
+    def describe(self, entry):
+        """One log line for an entry."""
+        first = self.entries[0]
+        parts = [f"traced {entry['traced_mb']:.1f} MB ({entry['traced_mb'] - first['traced_mb']:+.1f})"]
+        if entry["rss_mb"] is not None:
+            parts.append(f"RSS {entry['rss_mb']:.0f} MB ({entry['rss_mb'] - first['rss_mb']:+.0f})")
+        return f"{entry['label']}: " + ", ".join(parts) + " vs first snapshot"
+
+    def write(self):
+        report = {"session": self.session, "frames": FRAMES, "snapshots": self.entries}
+        try:
+            atomic_write_json(self.path, report)
+        except OSError as e:
+            print(f"[Memory] Could not save report: {e}")
+            return None
+        return self.path
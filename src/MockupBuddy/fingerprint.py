@@ -0,0 +1,72 @@
+"""
+Input fingerprints for incremental (make-style) batch regeneration.
+
+Every output written by a batch is recorded in a sidecar index,
+<output>/.mockupbuddy/fingerprints.json, together with a hash of what it
+was made from: the design and template file identities (name, size,
+mtime) and the render parameters. A later batch skips any job whose output
+exists with an unchanged fingerprint, without opening either image.
+"""
+
+import hashlib
+import json
+import os
+
+from .settings import atomic_write_json, read_json
+
+INDEX_NAME = os.path.join(".mockupbuddy", "fingerprints.json")
+
+
+def file_identity(path):
+    st = os.stat(path)
+    return [os.path.basename(path), st.st_size, st.st_mtime_ns]
+
+
+def compute_fingerprint(design_id, template_id, params, output_format):
+    payload = json.dumps({
+        "design": design_id,
+        "template": template_id,
+        "params": params.to_dict(),
+        "format": output_format,
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class FingerprintIndex:
+    """Output path (relative to the output folder) -> input fingerprint."""
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, INDEX_NAME)
+        data = read_json(self.path, {})
+        self._entries = data.get("outputs", {}) if isinstance(data, dict) else {}
+        self._identities = {}
+        self._dirty = False
+
+    def _key(self, out_path):
+        return os.path.relpath(out_path, self.output_folder).replace(os.sep, "/")
+
+    def identity(self, path):
+        """file_identity(), cached for the lifetime of this index (one batch)."""
+        identity = self._identities.get(path)
+        if identity is None:
+            identity = self._identities[path] = file_identity(path)
+        return identity
+
+    def fingerprint(self, design_path, template_path, params, out_path):
+        output_format = os.path.splitext(out_path)[1].lstrip(".").lower()
+        return compute_fingerprint(self.identity(design_path), self.identity(template_path), params, output_format)
+
+    def is_current(self, out_path, fingerprint):
+        return self._entries.get(self._key(out_path)) == fingerprint and os.path.exists(out_path)
+
+    def record(self, out_path, fingerprint):
+        key = self._key(out_path)
+        if self._entries.get(key) != fingerprint:
+            self._entries[key] = fingerprint
+            self._dirty = True
+
+    def save(self):
+        if self._dirty:
+            atomic_write_json(self.path, {"version": 1, "outputs": self._entries})
+            self._dirty = False
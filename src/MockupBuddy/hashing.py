@@ -0,0 +1,54 @@
+"""
+Content hashes of input files, cached by path + size + mtime.
+
+Hashing a 100 MB print file takes a while, so each digest is remembered in a
+small JSON index and reused until the file's size or mtime changes.
+"""
+
+import hashlib
+import os
+import threading
+
+from .settings import atomic_write_json, read_json
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentHasher:
+    """sha256 of file contents with a persistent (size, mtime) shortcut."""
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        data = read_json(index_path, {}) if index_path else {}
+        self._entries = data if isinstance(data, dict) else {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def digest(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        digest = hash_file(path)
+        with self._lock:
+            self._entries[path] = [st.st_size, st.st_mtime_ns, digest]
+            self._dirty = True
+        return digest
+
+    def save(self):
+        with self._lock:
+            if not (self._dirty and self.index_path):
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+        atomic_write_json(self.index_path, entries)
@@ -0,0 +1,192 @@
+"""
+Append-only checkpoint journal for batch runs.
+
+Every batch writes a JSON-lines file under <output>/.mockupbuddy/journals:
+the plan (folders, params, design groups), one line per planned job, then a
+line for each job that completes or fails and each design moved to
+"Completed Designs". A run that dies part-way leaves a journal without an
+"end" record, which is what the resume action looks for. Lines are flushed
+as they are written (so a crashed process loses nothing) and fsynced at
+most once a second (so a power cut loses at most a second of progress).
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+from .batch import BatchPlan, Job
+
+JOURNAL_DIR = os.path.join(".mockupbuddy", "journals")
+FSYNC_INTERVAL = 1.0
+
+
+def journal_dir(output_folder):
+    return os.path.join(output_folder, JOURNAL_DIR)
+
+
+@dataclass
+class JournalState:
+    """What a journal file says about its batch."""
+    path: str
+    plan: object
+    done: set = field(default_factory=set)
+    failed: set = field(default_factory=set)
+    moved: set = field(default_factory=set)
+    finished: bool = False
+
+
+class BatchJournal:
+    def __init__(self, path, fh):
+        self.path = path
+        self._fh = fh
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def start(cls, plan):
+        """Creates a new journal recording the plan and every planned job."""
+        directory = journal_dir(plan.output_folder)
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(directory, f"batch-{stamp}.jsonl")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(directory, f"batch-{stamp}-{suffix}.jsonl")
+        journal = cls(path, open(path, 'a', encoding='utf-8'))
+        journal._write({"event": "plan", "time": time.time(), "plan": plan.to_dict(include_jobs=False)})
+        for job in plan.jobs:
+            journal._write({"event": "job", **job.to_dict()}, sync=False)
+        journal._sync()
+        return journal
+
+    @classmethod
+    def reopen(cls, path):
+        """Opens an existing journal for appending after a resume."""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            needs_newline = False
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        fh = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            fh.write("\n")  # drop any half-written last line onto its own line
+        journal = cls(path, fh)
+        journal._write({"event": "resume", "time": time.time()})
+        return journal
+
+    def _write(self, record, sync=True):
+        self._fh.write(json.dumps(record) + "\n")
+        if sync:
+            self._fh.flush()
+            if time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+                self._sync()
+
+    def _sync(self):
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._last_sync = time.monotonic()
+
+    def record_done(self, job):
+        self._write({"event": "done", "id": job.id, "out_path": job.out_path})
+
+    def record_failed(self, job, error):
+        self._write({"event": "failed", "id": job.id, "error": str(error)})
+
+    def record_moved(self, design):
+        self._write({"event": "moved", "design": design})
+
+    def finish(self, summary):
+        self._write({"event": "end", "time": time.time(), **summary})
+        self.close()
+
+    def close(self):
+        if not self._fh.closed:
+            self._sync()
+            self._fh.close()
+
+
+def read_journal(path):
+    """Replays a journal into a JournalState. Unparseable (torn) lines are ignored."""
+    plan_data = None
+    jobs = []
+    state = JournalState(path=path, plan=None)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            event = record.get("event")
+            if event == "plan":
+                plan_data = record["plan"]
+            elif event == "job":
+                jobs.append(Job.from_dict(record))
+            elif event == "done":
+                state.done.add(record["id"])
+                state.failed.discard(record["id"])
+            elif event == "failed":
+                state.failed.add(record["id"])
+            elif event == "moved":
+                state.moved.add(record["design"])
+            elif event == "end":
+                state.finished = True
+            elif event == "resume":
+                state.finished = False
+    if plan_data is None:
+        raise ValueError(f"{path} has no batch plan")
+    state.plan = BatchPlan.from_dict(plan_data, jobs)
+    return state
+
+
+def _last_event(path):
+    """Event name of the last complete record, read from the file's tail only."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        tail = f.read().decode('utf-8', errors='ignore')
+    for line in reversed(tail.splitlines()):
+        try:
+            return json.loads(line).get("event")
+        except ValueError:
+            continue
+    return None
+
+
+def _has_plan(path):
+    """True when the journal starts with a plan record (a crash before the first flush leaves none)."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        first = f.readline()
+    try:
+        record = json.loads(first)
+    except ValueError:
+        return False
+    return isinstance(record, dict) and record.get("event") == "plan" and isinstance(record.get("plan"), dict)
+
+
+def find_incomplete(output_folder):
+    """
+    Returns the newest usable journal in output_folder if that batch never
+    finished, else None. Journals without a plan record can't be resumed and
+    are passed over.
+    """
+    directory = journal_dir(output_folder)
+    try:
+        paths = [os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".jsonl")]
+    except OSError:
+        return None
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            continue
+    for path in sorted(mtimes, key=mtimes.get, reverse=True):
+        try:
+            if not _has_plan(path):
+                continue
+            return None if _last_event(path) == "end" else path
+        except OSError:
+            continue
+    return None
@@ -0,0 +1,183 @@
+"""
+Memory accounting for parallel batches.
+
+A decoded 6000x6000 RGBA template is ~144 MB, and a render holds several
+images of that size at once. Before a job is handed to a worker its peak
+memory is estimated from image dimensions read from the file headers
+(nothing is decoded), and it is only admitted while everything in flight,
+plus the design pyramid cache the batch holds throughout, fits the batch's
+memory budget. A job bigger than the whole budget still runs, but alone.
+"""
+
+import os
+import sys
+import threading
+
+from PIL import Image
+
+BUDGET_FRACTION = 0.5  # default budget: this share of physical memory
+FALLBACK_BUDGET = 4 * 1024 ** 3  # when physical memory can't be determined
+
+
+def physical_memory():
+    """Total physical memory in bytes, or None if unknown."""
+    if sys.platform == "win32":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(status)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+        return None
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_budget():
+    total = physical_memory()
+    return int(total * BUDGET_FRACTION) if total else FALLBACK_BUDGET
+
+
+def _process_memory_counters():
+    """Windows PROCESS_MEMORY_COUNTERS for this process, or None."""
+    import ctypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return counters
+    return None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    if sys.platform == "win32":
+        counters = _process_memory_counters()
+        return counters.PeakWorkingSetSize if counters else None
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def current_rss():
+    """Resident set size of this process right now in bytes, or None if unknown (e.g. macOS)."""
+    if sys.platform == "win32":
+        counters = _process_memory_counters()
+        return counters.WorkingSetSize if counters else None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssHighWater:
+    """
+    Highest current_rss() seen by sample() since construction, for a peak
+    that belongs to one batch rather than to the whole process lifetime.
+    `peak` is None where the current RSS can't be read.
+    """
+
+    def __init__(self):
+        self.peak = current_rss()
+        self._lock = threading.Lock()
+
+    def sample(self):
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            if self.peak is None or rss > self.peak:
+                self.peak = rss
+
+
+class DimensionCatalog:
+    """(width, height) of image files, read from headers and cached by path + mtime."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Returns (width, height), or None if the file can't be read."""
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        try:
+            with Image.open(path) as img:
+                size = img.size
+        except (OSError, ValueError, Image.DecompressionBombError):
+            size = None
+        with self._lock:
+            self._entries[key] = size
+        return size
+
+
+def estimate_job_bytes(template_size, design_size, render_size, decodes_design):
+    """
+    Rough upper bound on the memory one render holds at its peak: the
+    template decoded and converted to RGBA plus its encoded output, the
+    overlay at render size (resized, faded, pasted), and, when the design
+    pyramid isn't cached yet, the full-resolution design being reduced.
+    """
+    total = 0
+    if template_size:
+        total += template_size[0] * template_size[1] * 4 * 3
+    total += render_size * render_size * 4 * 3
+    if decodes_design and design_size:
+        total += design_size[0] * design_size[1] * 4 * 2
+    return total
+
+
+class MemoryBudget:
+    """Admits work while the sum of reserved estimates stays within `limit` bytes."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0  # highest total reserved at once
+        self._lock = threading.Lock()
+
+    def try_acquire(self, nbytes):
+        with self._lock:
+            if self.in_use and self.in_use + nbytes > self.limit:
+                return False
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def acquire(self, nbytes):
+        """Reserves `nbytes` even past the limit (work that runs regardless, e.g. alone)."""
+        with self._lock:
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, nbytes):
+        with self._lock:
+            self.in_use -= nbytes
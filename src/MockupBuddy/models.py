@@ -0,0 +1,193 @@
+"""
+Qt item models backing MockupBuddy's list widgets.
+
+The models keep their state in plain Python structures (lists, sets, dicts)
+so the batch code can read selections without touching any widgets, and the
+views only ever create paint work for the rows that are on screen.
+"""
+
+from PySide6.QtCore import QAbstractListModel, QAbstractTableModel, QModelIndex, Qt, Signal
+
+from .search import NameIndex
+
+
+class FileListModel(QAbstractListModel):
+    """
+    File names for a picker combo box, searchable through a NameIndex.
+
+    Rows are the ids returned by the index for the current filter, so neither
+    filtering nor scrolling ever builds per-item widgets.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name_index = NameIndex()
+        self._filter = ""
+        self._rows = range(0)
+
+    def set_names(self, names):
+        self.beginResetModel()
+        self.name_index.set_names(names)
+        self._rows = self.name_index.search(self._filter)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_names([])
+
+    def set_filter(self, text):
+        if text == self._filter:
+            return
+        self.beginResetModel()
+        self._filter = text
+        self._rows = self.name_index.search(text)
+        self.endResetModel()
+
+    def name_at(self, row):
+        if 0 <= row < len(self._rows):
+            return self.name_index.names[self._rows[row]]
+        return ""
+
+    def row_of(self, name):
+        for row, i in enumerate(self._rows):
+            if self.name_index.names[i] == name:
+                return row
+        return -1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.name_index.names[self._rows[index.row()]]
+        return None
+
+
+class TemplateTableModel(QAbstractTableModel):
+    """
+    Mockup templates with checkable "use" and "Dark BG" columns.
+
+    State lives in `files` (all templates, sorted), `selected` (set of files
+    ticked for generation) and `dark_flags` (file -> bool). The optional
+    filter narrows the visible rows without touching that state.
+    """
+
+    USE_COLUMN = 0
+    DARK_COLUMN = 1
+
+    darkFlagChanged = Signal(str, bool)
+    selectionChanged = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.files = []
+        self.selected = set()
+        self.dark_flags = {}
+        self._filter = ""
+        self._rows = []  # indices into self.files currently visible
+
+    # --- Plain-data API used by the rest of the app ---
+
+    def set_templates(self, files, dark_flags):
+        self.beginResetModel()
+        self.files = list(files)
+        self.selected = set(self.files)
+        self.dark_flags = {f: bool(dark_flags.get(f, False)) for f in self.files}
+        self._rows = self._matching_rows(self._filter)
+        self.endResetModel()
+        self.selectionChanged.emit()
+
+    def clear(self):
+        self.set_templates([], {})
+
+    def selected_templates(self):
+        """Returns [(file, is_dark), ...] for every ticked template, in list order."""
+        return [(f, self.dark_flags[f]) for f in self.files if f in self.selected]
+
+    def is_dark(self, filename):
+        return self.dark_flags.get(filename, False)
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        self.beginResetModel()
+        self._filter = text
+        self._rows = self._matching_rows(text)
+        self.endResetModel()
+
+    def visible_files(self):
+        return [self.files[i] for i in self._rows]
+
+    def set_visible_selected(self, checked):
+        """Ticks or unticks every template matching the current filter."""
+        visible = self.visible_files()
+        if checked:
+            self.selected.update(visible)
+        else:
+            self.selected.difference_update(visible)
+        self._emit_column_changed(self.USE_COLUMN)
+        self.selectionChanged.emit()
+
+    def _matching_rows(self, text):
+        if not text:
+            return list(range(len(self.files)))
+        return [i for i, f in enumerate(self.files) if text in f.lower()]
+
+    def _emit_column_changed(self, column):
+        if self._rows:
+            self.dataChanged.emit(self.index(0, column), self.index(len(self._rows) - 1, column), [Qt.CheckStateRole])
+
+    # --- QAbstractTableModel interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return ("Template", "Dark BG")[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        filename = self.files[self._rows[index.row()]]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return filename if column == self.USE_COLUMN else "Dark BG"
+        if role == Qt.CheckStateRole:
+            if column == self.USE_COLUMN:
+                checked = filename in self.selected
+            else:
+                checked = self.dark_flags.get(filename, False)
+            return Qt.Checked if checked else Qt.Unchecked
+        if role == Qt.ToolTipRole and column == self.USE_COLUMN:
+            return filename
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        filename = self.files[self._rows[index.row()]]
+        checked = Qt.CheckState(value) == Qt.Checked
+        if index.column() == self.USE_COLUMN:
+            if checked:
+                self.selected.add(filename)
+            else:
+                self.selected.discard(filename)
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.selectionChanged.emit()
+        else:
+            self.dark_flags[filename] = checked
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.darkFlagChanged.emit(filename, checked)
+        return True
@@ -0,0 +1,53 @@
+"""
+File naming rules shared by the GUI, the pickers and batch generation.
+"""
+
+import os
+import re
+
+
+_SEPARATORS = re.compile(r'[\s\-]+')
+_SPECIAL = re.compile(r'[^a-z0-9_]')
+
+
+def normalize_text(text):
+    text = text.lower()
+    text = _SEPARATORS.sub('_', text)  # Replace spaces and dashes with underscores
+    text = _SPECIAL.sub('', text)  # Remove special characters
+    return text
+
+def normalize_name(filename):
+    return normalize_text(os.path.splitext(os.path.basename(filename))[0])
+
+def is_light_design(filename):
+    normalized = normalize_name(filename)
+    return normalized.endswith('_light')
+
+def is_dark_design(filename):
+    normalized = normalize_name(filename)
+    return normalized.endswith('_dark')
+
+def get_design_basename(filename):
+    base = normalize_name(filename)
+    base = re.sub(r'_light$|_dark$', '', base)
+    return base
+
+def get_design_type(filename):
+    if is_dark_design(filename):
+        return "dark"
+    elif is_light_design(filename):
+        return "light"
+    return "neutral"
+
+def is_compatible(design_type, template_is_dark):
+    """Dark designs only go on dark templates, light designs only on light ones."""
+    return not (
+        (design_type == "dark" and not template_is_dark) or
+        (design_type == "light" and template_is_dark)
+    )
+
+def get_output_name(design_base, template_file, extension="png"):
+    """Returns (folder name, file name) for a design base + template pairing."""
+    sanitized_base = re.sub(r'\s+', '_', design_base.strip().lower())
+    color_part = template_file.replace(".png", "")
+    return f"Mockups - {sanitized_base}", f"{sanitized_base}_{color_part}.{extension}"
@@ -0,0 +1,151 @@
+"""
+Opt-in cProfile hooks for startup, previews and batches.
+
+Set MOCKUPBUDDY_PROFILE=1 (or a comma list of scopes such as
+"preview,batch") or pass --profile to profile every run of those scopes;
+the GUI can also arm a one-off profile of the next preview and batch. Each
+profile is written as a .prof file to PROFILE_DIR, named after the session
+and scope, ready for `python -m pstats`, snakeviz and the like.
+
+From Python 3.12 cProfile sits on sys.monitoring, which allows one active
+profiler per process and already sees every thread. There one profile()
+block runs at a time process-wide; a block entered from another thread
+meanwhile (a preview during a profiled batch) simply isn't profiled.
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from .settings import PROFILE_DIR
+
+PROFILE_ENV = "MOCKUPBUDDY_PROFILE"
+SCOPES = ("startup", "preview", "batch")
+PROCESS_WIDE = sys.version_info >= (3, 12)  # one cProfile per process, covering all threads
+
+
+def scopes_from_env(value):
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return set()
+    if value in ("1", "true", "yes", "on", "all"):
+        return set(SCOPES)
+    return {scope.strip() for scope in value.split(",")} & set(SCOPES)
+
+
+class ProfileRun:
+    """What one profile() block produced; path is set when the block exits."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.path = None
+        self.seconds = 0.0
+
+
+class _ThreadProfiles:
+    """
+    threading.setprofile() hook that starts a cProfile.Profile in every
+    thread created while it is installed (e.g. a batch's render pool). The
+    hook runs once per thread: enabling the profiler replaces it. Only used
+    before Python 3.12, where each thread needs its own profiler.
+    """
+
+    def __init__(self):
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def __call__(self, frame, event, arg):
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return  # another profiling tool owns this thread; never break the worker over it
+        with self._lock:
+            self.profiles.append(profile)
+
+
+class Profiler:
+    def __init__(self, directory=PROFILE_DIR, scopes=None):
+        self.directory = directory
+        self.scopes = scopes_from_env(os.environ.get(PROFILE_ENV)) if scopes is None else set(scopes)
+        self.session = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._armed = set()
+        self._active = set()  # threads (or None: the whole process) with a profile() block running
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def arm(self, *scopes):
+        """Profiles the next run of each scope (default: the next preview and the next batch)."""
+        self._armed.update(scopes or ("preview", "batch"))
+
+    def wants(self, scope):
+        return scope in self.scopes or scope in self._armed
+
+    @contextmanager
+    def profile(self, scope, threads=False):
+        """
+        Profiles the block if `scope` is enabled or armed, else does nothing.
+        With threads=True, threads started inside the block are profiled
+        too and merged into the same file.
+        """
+        # Nested blocks fold into the outer one; from 3.12 so do blocks on other threads
+        owner = None if PROCESS_WIDE else threading.get_ident()
+        with self._lock:
+            claimed = self.wants(scope) and owner not in self._active
+            if claimed:
+                self._active.add(owner)
+        if not claimed:
+            yield None
+            return
+        import cProfile  # imported on first use; most runs never profile anything
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # e.g. a debugger or an outside profiler is already active
+            with self._lock:
+                self._active.discard(owner)
+            print(f"[Profile] Skipped {scope} profile: {e}")
+            yield None
+            return
+        self._armed.discard(scope)
+        run = ProfileRun(scope)
+        thread_profiles = _ThreadProfiles() if threads and not PROCESS_WIDE else None
+        if thread_profiles:
+            threading.setprofile(thread_profiles)
+        start = time.perf_counter()
+        try:
+            yield run
+        finally:
+            profile.disable()
+            run.seconds = time.perf_counter() - start
+            if thread_profiles:
+                threading.setprofile(None)
+            with self._lock:
+                self._active.discard(owner)
+            run.path = self._save(scope, profile, thread_profiles.profiles if thread_profiles else ())
+
+    def _save(self, scope, profile, extra):
+        with self._lock:
+            self._count += 1
+            count = self._count
+        path = os.path.join(self.directory, f"{self.session}-{count:03d}-{scope}.prof")
+        import pstats
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stats = pstats.Stats(profile)
+            for thread_profile in extra:
+                try:
+                    stats.add(thread_profile)
+                except TypeError:
+                    pass  # a thread that never ran any Python code
+            stats.dump_stats(path)
+        except (OSError, TypeError) as e:
+            print(f"[Profile] Could not save {scope} profile: {e}")
+            return None
+        return path
@@ -0,0 +1,81 @@
+"""
+Job-level batch progress: counts, throughput and ETA.
+
+run_batch() reports every finished job through on_job; a ProgressTracker
+fed from that callback can be snapshotted at whatever rate the UI wants
+(the desktop app polls it ten times a second) instead of the UI reacting
+to every job.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+SKIPPED_OUTCOMES = ("resumed", "up_to_date")  # jobs that needed no work at all
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+@dataclass
+class ProgressSnapshot:
+    total: int
+    done: int  # finished jobs of any outcome, failures included
+    failed: int
+    skipped: int
+    elapsed: float
+    rate: float  # jobs per second, not counting resumed ones
+    eta: object  # seconds, or None until there is a rate to go on
+    current: str = ""  # design variant most recently started
+
+    def describe(self):
+        parts = [f"{self.done} of {self.total}", f"{self.rate:.1f} img/s", f"{format_duration(self.elapsed)} elapsed"]
+        if self.eta is not None and self.done < self.total:
+            parts.append(f"ETA {format_duration(self.eta)}")
+        if self.skipped:
+            parts.append(f"{self.skipped} skipped")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        return " · ".join(parts)
+
+
+class ProgressTracker:
+    """Thread-safe: fed from the batch thread, read from the UI."""
+
+    def __init__(self, total, clock=time.monotonic):
+        self.total = total
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._done = 0
+        self._failed = 0
+        self._skipped = 0
+        self._resumed = 0
+        self._current = ""
+
+    def design_started(self, variant):
+        with self._lock:
+            self._current = variant
+
+    def job_finished(self, outcome):
+        with self._lock:
+            self._done += 1
+            if outcome == "failed":
+                self._failed += 1
+            elif outcome in SKIPPED_OUTCOMES:
+                self._skipped += 1
+            if outcome == "resumed":
+                self._resumed += 1
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = self._clock() - self._started
+            worked = self._done - self._resumed
+            rate = worked / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self._done) / rate if rate > 0 else None
+            return ProgressSnapshot(self.total, self._done, self._failed, self._skipped, elapsed, rate, eta,
+                                    self._current)
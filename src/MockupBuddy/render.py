@@ -0,0 +1,89 @@
+"""
+The mockup compositing path shared by the live preview and batch generation.
+"""
+
+import io
+from dataclasses import asdict, dataclass
+
+from PIL import Image
+
+from .pyramid import build_pyramid, resize_from_pyramid
+from .timing import span
+
+# Output file extension -> Pillow format name
+OUTPUT_FORMATS = {"png": "PNG", "jpg": "JPEG", "webp": "WEBP"}
+
+
+@dataclass
+class RenderParams:
+    """Slider settings for a render. Opacity is a percentage (0-100)."""
+    size: int = 400
+    opacity: int = 100
+    x_offset: int = 0
+    y_offset: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: int(v) for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+def apply_opacity(image, opacity):
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    alpha = image.getchannel('A').point(lambda p: int(p * opacity))
+    image.putalpha(alpha)
+    return image
+
+
+def open_template(path):
+    with Image.open(path) as img:
+        return img.convert("RGBA")
+
+
+def render_mockup(template_img, design_levels, params):
+    """
+    Pastes the design (given as pyramid levels) onto the template and returns
+    the template image. The template is modified in place unless it is a
+    read-only mapped image, in which case Pillow copies it first.
+    """
+    new_w, new_h = params.size, params.size
+    with span("resize"):
+        overlay = resize_from_pyramid(design_levels, (new_w, new_h))
+    with span("opacity"):
+        overlay = apply_opacity(overlay, params.opacity / 100.0)
+    x = (template_img.width - new_w) // 2 + params.x_offset
+    y = (template_img.height - new_h) // 2 + params.y_offset
+    with span("paste"):
+        template_img.paste(overlay, (x, y), overlay)
+    overlay.close()
+    return template_img
+
+
+def render_file(design_path, template_path, params=None):
+    """Renders one design file onto one template file and returns the mockup image."""
+    params = params or RenderParams()
+    with span("decode"):
+        with Image.open(design_path) as design:
+            levels = build_pyramid(design.convert("RGBA"), params.size)
+        template_img = open_template(template_path)
+    return render_mockup(template_img, levels, params)
+
+
+def encode_image(image, output_format):
+    """Encodes a rendered mockup to bytes in one of OUTPUT_FORMATS."""
+    pil_format = OUTPUT_FORMATS[output_format]
+    with span("encode"):
+        return _encode(image, pil_format)
+
+
+def _encode(image, pil_format):
+    buffer = io.BytesIO()
+    if pil_format == "JPEG" and image.mode != "RGB":
+        with image.convert("RGB") as rgb:
+            rgb.save(buffer, format=pil_format)
+    else:
+        image.save(buffer, format=pil_format)
+    return buffer.getvalue()
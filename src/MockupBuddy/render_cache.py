@@ -0,0 +1,166 @@
+"""
+Content-addressed, size-bounded cache of encoded mockups.
+
+Renders are stored under a key derived from the content hashes of the
+design and template plus the render parameters, so the same combination is
+never rendered twice, whatever folder it is written to. Outputs are
+materialized from the cache as a reflink (copy-on-write clone) where the
+filesystem supports it and a plain copy otherwise. Outputs are never
+hardlinked: a shared inode would let an edited output corrupt the cache
+entry. Hits touch a `.used` marker next to the entry rather than the entry
+itself, so outputs hardlinked by older versions keep their mtimes, and
+evict() trims the cache back to its byte budget least recently used first,
+also dropping entries past max_age.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from .settings import RENDER_CACHE_GB
+
+DEFAULT_MAX_BYTES = RENDER_CACHE_GB * 1024 ** 3
+DEFAULT_MAX_AGE = 90 * 24 * 3600  # seconds
+USED_SUFFIX = ".used"  # marker touched on every hit; its mtime is the entry's last use
+
+
+def _reflink(src, dst):
+    """Copy-on-write clone of src to dst. Raises OSError when unsupported."""
+    if sys.platform.startswith('linux'):
+        import fcntl
+        FICLONE = 0x40049409
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            try:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            except OSError:
+                d.close()
+                os.remove(dst)
+                raise
+        return
+    if sys.platform == 'darwin':
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            raise OSError(ctypes.get_errno(), "clonefile failed")
+        return
+    raise OSError("reflinks are not supported on this platform")
+
+
+def materialize(src, dst):
+    """
+    Places a copy of src at dst, replacing any existing file atomically.
+    Returns the method used: "reflink" or "copy".
+    """
+    directory = os.path.dirname(dst)
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{os.path.basename(dst)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    method = None
+    for name, link in (("reflink", _reflink), ("copy", shutil.copyfile)):
+        try:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            link(src, tmp)
+            method = name
+            break
+        except OSError:
+            if name == "copy":
+                raise
+    os.replace(tmp, dst)
+    return method
+
+
+class RenderCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(design_digest, template_digest, params, output_format):
+        payload = json.dumps({
+            "design": design_digest,
+            "template": template_digest,
+            "params": params.to_dict(),
+            "format": output_format,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key, output_format):
+        return os.path.join(self.directory, key[:2], f"{key}.{output_format}")
+
+    def lookup(self, key, output_format):
+        """Returns the cached file for key, or None. A hit counts as a use for eviction."""
+        path = self._path(key, output_format)
+        if not os.path.isfile(path):
+            return None
+        marker = path + USED_SUFFIX
+        try:
+            try:
+                os.utime(marker)
+            except FileNotFoundError:
+                with open(marker, 'ab'):
+                    pass
+        except OSError:
+            pass  # recency is best effort; the entry is still usable
+        return path
+
+    def store(self, key, output_format, data):
+        """Writes encoded bytes for key and returns the cache path."""
+        path = self._path(key, output_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until under budget. Returns bytes freed."""
+        files, used = {}, {}
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                st = entry.stat()
+                if entry.name.endswith(USED_SUFFIX):
+                    used[entry.path[:-len(USED_SUFFIX)]] = st.st_mtime
+                else:
+                    files[entry.path] = st
+        for path in used.keys() - files.keys():
+            try:
+                os.remove(path + USED_SUFFIX)  # marker left behind by an entry removed elsewhere
+            except OSError:
+                pass
+        entries = sorted((max(st.st_mtime, used.get(path, 0)), st.st_size, path) for path, st in files.items())
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.max_age if self.max_age else None
+        freed = 0
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and (cutoff is None or mtime >= cutoff):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            try:
+                os.remove(path + USED_SUFFIX)
+            except OSError:
+                pass
+            total -= size
+            freed += size
+        return freed
@@ -0,0 +1,115 @@
+"""
+Type-ahead name index for the design and mockup pickers.
+
+Entries keep the plain sorted(names) order of the pickers, so an entry's id
+is also its display position; matching uses normalize_name() keys. One- and
+two-character queries are answered as prefix ranges with a binary search
+over the keys in sorted order. Longer queries go through a trigram index
+and only the shortest posting list is checked with a real substring test.
+
+set_names() only sorts the names. Keys and trigram postings are built
+right after it, on a background thread for large folders, so neither a
+reload nor a keystroke pays for the indexing: until the postings exist,
+longer queries scan the keys directly (a few ms at 100k names).
+"""
+
+import bisect
+import threading
+from array import array
+
+from .naming import normalize_name, normalize_text
+
+BACKGROUND_MIN = 2000  # smaller lists are indexed inline; a thread isn't worth it
+
+
+def _trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class _Keys:
+    """Normalized keys for one set_names() call; postings are attached once built."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        by_key = sorted(range(len(keys)), key=keys.__getitem__)
+        self.sorted_keys = [keys[i] for i in by_key]
+        self.by_key = array('i', by_key)
+        self.postings = None
+
+
+class NameIndex:
+    """Prefix + trigram substring index over a list of file names."""
+
+    def __init__(self, names=()):
+        self._known = {}  # name -> key from the previous build; a reload mostly lists the same files
+        self.set_names(names)
+
+    def set_names(self, names):
+        self.names = sorted(names)
+        self._keys = None
+        self._ready = threading.Event()
+        if len(self.names) < BACKGROUND_MIN:
+            self._build(self.names, self._ready)
+        else:
+            threading.Thread(target=self._build, args=(self.names, self._ready), name="name-index",
+                             daemon=True).start()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build(self, names, ready):
+        known = self._known
+        keys = [known.get(n) or normalize_name(n) for n in names]
+        index = _Keys(keys)
+        current = names is self.names  # set_names() may have moved on while this ran
+        if current:
+            self._known = dict(zip(names, keys))
+            self._keys = index
+        ready.set()
+        if current:
+            index.postings = self._build_postings(keys)
+
+    @staticmethod
+    def _build_postings(keys):
+        postings = {}
+        for i, key in enumerate(keys):
+            for gram in _trigrams(key):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('i')
+                posting.append(i)
+        return postings
+
+    def search(self, query):
+        """
+        Returns the ascending ids of entries whose key contains the normalized
+        query. Queries shorter than three characters match key prefixes only.
+        """
+        q = normalize_text(query)
+        if not q:
+            return range(len(self.names))
+        index = self._keys
+        if index is None:
+            self._ready.wait()  # only right after a large set_names(), while the keys are computed
+            index = self._keys
+        if len(q) < 3:
+            lo = bisect.bisect_left(index.sorted_keys, q)
+            hi = bisect.bisect_left(index.sorted_keys, q + '\x7f', lo)
+            if hi - lo == len(index.keys):
+                return range(len(index.keys))
+            return sorted(index.by_key[lo:hi])
+
+        keys = index.keys
+        postings = index.postings
+        if postings is None:
+            return [i for i, key in enumerate(keys) if q in key]
+        shortest = None
+        for gram in _trigrams(q):
+            posting = postings.get(gram)
+            if posting is None:
+                return []
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        if len(q) == 3:
+            return shortest
+        return [i for i in shortest if q in keys[i]]
@@ -0,0 +1,171 @@
+"""
+In-memory settings with debounced, atomic persistence to JSON.
+
+Settings live in memory and are written back on a short timer, so a burst of
+changes (dragging a slider, toggling a checkbox) costs a single write. Every
+write goes to a temp file that is fsynced and renamed over the target, which
+means a crash can never leave a truncated settings file behind.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+
+CONFIG_PATH = os.path.expanduser("~/.wbmockup_config.json")
+TEMPLATES_PATH = os.path.expanduser("~/.wbmockup_templates.json")
+CACHE_DIR = os.path.expanduser("~/.wbmockup_cache")
+PROFILE_DIR = os.path.expanduser("~/.wbmockup_profiles")
+
+SAVE_DELAY = 0.5  # seconds of quiet before pending changes hit the disk
+RENDER_CACHE_GB = 5  # default disk budget of the render cache under CACHE_DIR
+
+
+def atomic_write_bytes(path, data):
+    """Write data to path via temp file + fsync + rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if os.name == 'posix':
+        # Make the rename itself durable
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+def atomic_write_json(path, data):
+    atomic_write_bytes(path, json.dumps(data, indent=2).encode('utf-8'))
+
+
+def read_json(path, default=None):
+    """
+    Returns the parsed contents of a JSON file, or default when it is missing.
+    An unreadable file is moved aside to <path>.corrupt rather than being
+    silently overwritten by the next save.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        print(f"[Settings] Could not read {path}: {e}")
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+        return default
+
+
+class SettingsStore:
+    """
+    Dict-like settings held in memory and saved with a debounce timer.
+
+    One long-lived daemon thread per store does the delayed saves: each
+    change only pushes its deadline back, so a slider drag firing dozens of
+    set() calls a second does not start a thread per call.
+
+    Values handed to set() are owned by the store; callers replace nested
+    dicts rather than mutating them in place so a background save never sees
+    a half-updated value.
+    """
+
+    def __init__(self, path, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        data = read_json(path, {})
+        self._data = data if isinstance(data, dict) else {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._deadline = None  # monotonic time of the pending save, if any
+        self._saver = None
+        self._dirty = False
+        atexit.register(self.flush)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._data[key]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._data and self._data[key] == value:
+                return
+            self._data[key] = value
+            self._dirty = True
+        self._schedule()
+
+    def update(self, values):
+        with self._lock:
+            changed = {k: v for k, v in values.items() if k not in self._data or self._data[k] != v}
+            if not changed:
+                return
+            self._data.update(changed)
+            self._dirty = True
+        self._schedule()
+
+    def _schedule(self):
+        with self._lock:
+            self._deadline = time.monotonic() + self.delay
+            if self._saver is None:
+                self._saver = threading.Thread(target=self._save_loop, name="settings-save", daemon=True)
+                self._saver.start()
+            self._wake.notify()
+
+    def _save_loop(self):
+        while True:
+            with self._lock:
+                while self._deadline is None or self._deadline > time.monotonic():
+                    self._wake.wait(None if self._deadline is None else self._deadline - time.monotonic())
+                self._deadline = None
+            self.flush()
+
+    def flush(self):
+        """Write pending changes now. Safe to call from any thread."""
+        with self._write_lock:
+            with self._lock:
+                self._deadline = None
+                if not self._dirty:
+                    return
+                payload = json.dumps(self._data, indent=2).encode('utf-8')
+                self._dirty = False
+            try:
+                atomic_write_bytes(self.path, payload)
+            except OSError as e:
+                print(f"[Settings] Failed to save {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True
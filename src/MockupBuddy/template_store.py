@@ -0,0 +1,111 @@
+"""
+Disk store of pre-decoded template pixels, memory-mapped on later runs.
+
+Each template's RGBA pixels are written once to a raw file: a one-page
+header (magic, size, mode and the source file's mtime/size) followed by the
+pixel data starting on a page boundary. Later opens map that file read-only
+and wrap it as a Pillow image (or NumPy array) without copying, so repeated
+batches skip PNG/JPEG decoding and share the OS page cache across processes.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+from PIL import Image
+
+MAGIC = b"MBRGBA01"
+HEADER_SIZE = 4096  # pixel data starts on a page boundary
+_HEADER = struct.Struct("<8sII4sqq")  # magic, width, height, mode, src mtime_ns, src size
+
+
+class TemplateStore:
+    """Decoded-template cache rooted at `directory`."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_path(self, source_path):
+        digest = hashlib.sha1(os.path.abspath(source_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + ".rgba")
+
+    def _map(self, source_path, st):
+        """Returns (mmap, width, height) for a valid entry, or None."""
+        entry = self._entry_path(source_path)
+        try:
+            with open(entry, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mm) < HEADER_SIZE:
+            mm.close()
+            return None
+        magic, width, height, mode, mtime_ns, size = _HEADER.unpack_from(mm, 0)
+        if (
+            magic != MAGIC or mode != b"RGBA" or
+            mtime_ns != st.st_mtime_ns or size != st.st_size or
+            len(mm) != HEADER_SIZE + width * height * 4
+        ):
+            mm.close()
+            return None
+        return mm, width, height
+
+    def _write(self, source_path, st, image):
+        header = _HEADER.pack(MAGIC, image.width, image.height, b"RGBA", st.st_mtime_ns, st.st_size)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header.ljust(HEADER_SIZE, b"\0"))
+                f.write(image.tobytes())
+            os.replace(tmp_path, self._entry_path(source_path))
+        except OSError:
+            # e.g. disk full, or the old entry is still mapped on Windows
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def open(self, source_path):
+        """
+        Returns the template as an RGBA image. A stored entry comes back as a
+        read-only image over the mapped file; otherwise the source is decoded
+        and stored for next time.
+        """
+        st = os.stat(source_path)
+        mapped = self._map(source_path, st)
+        if mapped is not None:
+            mm, width, height = mapped
+            pixels = memoryview(mm)[HEADER_SIZE:]
+            return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+        with Image.open(source_path) as source:
+            image = source.convert("RGBA")
+        self._write(source_path, st, image)
+        return image
+
+    def open_array(self, source_path):
+        """Returns the template as a read-only (height, width, 4) uint8 NumPy array."""
+        import numpy as np
+
+        st = os.stat(source_path)
+        mapped = self._map(source_path, st)
+        if mapped is None:
+            with Image.open(source_path) as source:
+                image = source.convert("RGBA")
+            self._write(source_path, st, image)
+            mapped = self._map(source_path, st)
+            if mapped is None:
+                return np.asarray(image)
+        mm, width, height = mapped
+        return np.frombuffer(mm, dtype=np.uint8, offset=HEADER_SIZE).reshape(height, width, 4)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".rgba"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,164 @@
+"""
+Per-stage timing spans for the render path.
+
+The render code marks its stages with `span("resize")` and so on. Spans only
+measure anything while a collector is attached to the same thread (a
+`StageTimings.job()` or `tracing.TraceRecorder.job()` block); everywhere else
+span() hands back a shared no-op, so instrumented code costs a thread-local
+lookup per stage when timing is off.
+
+A StageTimings collects one {stage: seconds} dict per job and turns them into
+a report: per-stage totals and percentiles plus the slowest jobs, written as
+JSON (the full report) and CSV (one row per job).
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from time import perf_counter
+
+from .settings import atomic_write_bytes
+
+STAGES = ("lookup", "decode", "resize", "opacity", "paste", "encode", "write")
+REPORT_DIR = os.path.join(".mockupbuddy", "reports")
+
+_local = threading.local()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("sinks", "stage", "start")
+
+    def __init__(self, sinks, stage):
+        self.sinks = sinks
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = perf_counter()
+        for sink in self.sinks:
+            sink.add_span(self.stage, self.start, end)
+        return False
+
+
+def span(stage):
+    """Times a stage of the job running on this thread, if one is being timed."""
+    sinks = getattr(_local, "sinks", None)
+    if not sinks:
+        return _NULL_SPAN
+    return _Span(tuple(sinks), stage)
+
+
+@contextmanager
+def collecting(sink):
+    """Routes span() calls on this thread to sink.add_span(stage, start, end) while active."""
+    sinks = getattr(_local, "sinks", None)
+    if sinks is None:
+        sinks = _local.sinks = []
+    sinks.append(sink)
+    try:
+        yield sink
+    finally:
+        sinks.remove(sink)
+
+
+class _JobStages(dict):
+    """{stage: seconds} for one job, summing repeated spans of a stage."""
+
+    def add_span(self, stage, start, end):
+        self[stage] = self.get(stage, 0.0) + end - start
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+
+def format_stages(stages):
+    """'decode 12 ms, resize 30 ms, ...' for a log line."""
+    return ", ".join(f"{name} {stages[name] * 1000:.0f} ms" for name in STAGES if name in stages)
+
+
+class StageTimings:
+    """Stage durations for every job of a run. job() may be used from several threads."""
+
+    def __init__(self):
+        self.jobs = []  # [(label, {stage: seconds, "total": seconds})]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def job(self, label):
+        stages = _JobStages()
+        start = perf_counter()
+        try:
+            with collecting(stages):
+                yield stages
+        finally:
+            stages["total"] = perf_counter() - start
+            with self._lock:
+                self.jobs.append((label, stages))
+
+    def report(self, slowest=10):
+        with self._lock:
+            jobs = list(self.jobs)
+        stage_report = {}
+        for name in STAGES + ("total",):
+            values = sorted(stages[name] for _, stages in jobs if name in stages)
+            if not values:
+                continue
+            stage_report[name] = {
+                "count": len(values),
+                "total": round(sum(values), 6),
+                "mean": round(sum(values) / len(values), 6),
+                "p50": round(percentile(values, 0.50), 6),
+                "p90": round(percentile(values, 0.90), 6),
+                "p99": round(percentile(values, 0.99), 6),
+                "max": round(values[-1], 6),
+            }
+        ranked = sorted(jobs, key=lambda item: item[1].get("total", 0.0), reverse=True)[:slowest]
+        return {
+            "jobs": len(jobs),
+            "stages": stage_report,
+            "slowest": [{"job": label, **{k: round(v, 6) for k, v in stages.items()}} for label, stages in ranked],
+        }
+
+    def to_csv(self):
+        with self._lock:
+            jobs = list(self.jobs)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(("job",) + STAGES + ("total",))
+        for label, stages in jobs:
+            writer.writerow([label] + [f"{stages.get(name, 0.0):.6f}" for name in STAGES + ("total",)])
+        return buffer.getvalue()
+
+    def write(self, output_folder, stem=None):
+        """Writes <output>/.mockupbuddy/reports/<stem>.timing.json and .csv; returns both paths."""
+        directory = os.path.join(output_folder, REPORT_DIR)
+        stem = stem or "batch-" + time.strftime("%Y%m%d-%H%M%S")
+        json_path = os.path.join(directory, stem + ".timing.json")
+        csv_path = os.path.join(directory, stem + ".timing.csv")
+        atomic_write_bytes(json_path, json.dumps(self.report(), indent=2).encode('utf-8'))
+        atomic_write_bytes(csv_path, self.to_csv().encode('utf-8'))
+        return json_path, csv_path
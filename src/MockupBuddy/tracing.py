@@ -0,0 +1,101 @@
+"""
+Chrome trace-event export for batch runs.
+
+A TraceRecorder attached to a batch records every job and every timed
+stage (see timing.span) as a complete ("X") event on the track of the
+thread that ran it, plus counter ("C") events for the work queue. The
+file it writes opens directly in chrome://tracing or ui.perfetto.dev,
+which makes it easy to see where workers sit idle.
+
+Format reference: the "Trace Event Format" document used by Chrome's
+about:tracing and Perfetto.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from time import perf_counter
+
+from .settings import atomic_write_bytes
+from .timing import REPORT_DIR, collecting
+
+
+class TraceRecorder:
+    """Collects trace events from any number of threads."""
+
+    def __init__(self, process_name="MockupBuddy"):
+        self.process_name = process_name
+        self._origin = perf_counter()
+        self._pid = os.getpid()
+        self._events = []
+        self._threads = {}  # thread ident -> (track id, thread name)
+        self._lock = threading.Lock()
+
+    def _ts(self, t):
+        return round((t - self._origin) * 1e6, 1)  # microseconds since the recorder was created
+
+    def _tid(self):
+        ident = threading.get_ident()
+        track = self._threads.get(ident)
+        if track is None:
+            with self._lock:
+                track = self._threads.setdefault(ident, (len(self._threads) + 1, threading.current_thread().name))
+        return track[0]
+
+    def _complete(self, name, category, start, end, args=None):
+        event = {
+            "name": name, "cat": category, "ph": "X", "pid": self._pid, "tid": self._tid(),
+            "ts": self._ts(start), "dur": round((end - start) * 1e6, 1),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    def add_span(self, stage, start, end):
+        """timing.span() sink: one event per stage."""
+        self._complete(stage, "stage", start, end)
+
+    @contextmanager
+    def job(self, label, **args):
+        """Records a job event and attaches this recorder to the thread's stage spans."""
+        start = perf_counter()
+        try:
+            with collecting(self):
+                yield self
+        finally:
+            self._complete(label, "job", start, perf_counter(), args)
+
+    @contextmanager
+    def span(self, name, **args):
+        """Records a span on the current thread's track that is not part of a job."""
+        start = perf_counter()
+        try:
+            yield self
+        finally:
+            self._complete(name, "batch", start, perf_counter(), args)
+
+    def counter(self, name, **values):
+        event = {"name": name, "ph": "C", "pid": self._pid, "ts": self._ts(perf_counter()), "args": values}
+        with self._lock:
+            self._events.append(event)
+
+    def to_dict(self):
+        with self._lock:
+            events = list(self._events)
+            threads = list(self._threads.values())
+        metadata = [{"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": self.process_name}}]
+        for tid, name in threads:
+            metadata.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}})
+            metadata.append({"name": "thread_sort_index", "ph": "M", "pid": self._pid, "tid": tid,
+                             "args": {"sort_index": tid}})
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, output_folder, stem=None):
+        """Writes <output>/.mockupbuddy/reports/<stem>.trace.json and returns its path."""
+        stem = stem or "batch-" + time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(output_folder, REPORT_DIR, stem + ".trace.json")
+        atomic_write_bytes(path, json.dumps(self.to_dict()).encode('utf-8'))
+        return path
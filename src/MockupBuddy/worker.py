@@ -0,0 +1,99 @@
+"""
+Runs a batch on a background thread so the window stays responsive.
+
+The batch thread never touches Qt. It records progress in a
+ProgressTracker and queues log lines; a timer on the GUI thread picks both
+up at most ten times a second and emits them as signals, so connected
+slots always run on the GUI thread and the UI costs the same however fast
+jobs finish.
+"""
+
+import queue
+import threading
+from contextlib import nullcontext
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from .batch import BatchControl, run_batch
+from .progress import ProgressTracker
+
+UPDATE_INTERVAL_MS = 100  # UI updates at most 10 times a second
+
+
+class BatchWorker(QObject):
+    log = Signal(str)  # one or more lines, newline-separated
+    progress = Signal(object)  # ProgressSnapshot
+    finished = Signal(object)  # BatchResult
+    failed = Signal(str)
+
+    def __init__(self, plan, journal, done=(), parent=None, profiler=None, **options):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.plan = plan
+        self.journal = journal
+        self.done = done
+        self.options = options
+        self.control = BatchControl()
+        self.tracker = ProgressTracker(len(plan.jobs))
+        self._lines = queue.SimpleQueue()
+        self._outcome = None  # ("finished", result) or ("failed", message), set by the batch thread
+        self._thread = threading.Thread(target=self._run, name="MockupBuddy batch", daemon=True)
+        self._timer = QTimer(self)
+        self._timer.setInterval(UPDATE_INTERVAL_MS)
+        self._timer.timeout.connect(self._deliver)
+
+    def start(self):
+        self._thread.start()
+        self._timer.start()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+
+    # Thread-safe; BatchControl only flips events
+    def pause(self):
+        self.control.pause()
+
+    def resume(self):
+        self.control.resume()
+
+    def cancel(self):
+        self.control.cancel()
+
+    def _run(self):
+        # Batch thread: no Qt calls past this point
+        profiling = self.profiler.profile("batch", threads=True) if self.profiler else nullcontext()
+        try:
+            with profiling as run:
+                result = run_batch(
+                    self.plan, journal=self.journal, done=self.done, control=self.control,
+                    log=self._lines.put,
+                    progress=lambda index, count, base, variant: self.tracker.design_started(variant),
+                    on_job=lambda job, outcome, error: self.tracker.job_finished(outcome),
+                    **self.options
+                )
+            if run and run.path:
+                self._lines.put(f"🔬 Batch profile ({run.seconds:.1f} s) saved to {run.path}")
+            outcome = ("finished", result)
+        except Exception as e:
+            outcome = ("failed", str(e))
+        finally:
+            self.journal.close()
+        self._outcome = outcome
+
+    def _deliver(self):
+        outcome = self._outcome  # read before draining so no trailing lines are missed
+        lines = []
+        while True:
+            try:
+                lines.append(self._lines.get_nowait())
+            except queue.Empty:
+                break
+        if lines:
+            self.log.emit("\n".join(lines))
+        self.progress.emit(self.tracker.snapshot())
+        if outcome is not None:
+            self._timer.stop()
+            getattr(self, outcome[0]).emit(outcome[1])
@@ -0,0 +1,65 @@
+"""
+Output writing that leaves identical files alone.
+
+Output folders are often synced to cloud storage, where rewriting a file
+with the same bytes still bumps its mtime and triggers a re-upload. These
+helpers compare against what is already on disk first and, when a write is
+needed, go through a temp file + rename so sync clients never pick up a
+half-written image.
+"""
+
+import filecmp
+import os
+import tempfile
+import threading
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_matches(path, data):
+    """True if the file at path holds exactly `data`."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            offset = 0
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                if chunk != data[offset:offset + len(chunk)]:
+                    return False
+                offset += len(chunk)
+        return offset == len(data)
+    except OSError:
+        return False
+
+
+def same_file_contents(a, b):
+    try:
+        if os.path.samefile(a, b):
+            return True
+        return filecmp.cmp(a, b, shallow=False)
+    except OSError:
+        return False
+
+
+def atomic_write(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.{threading.get_ident()}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(path, data):
+    """Writes data to path unless the file already holds it. Returns True if written."""
+    if file_matches(path, data):
+        return False
+    atomic_write(path, data)
+    return True